@@ -1,8 +1,14 @@
 import logging
 import os
 import sys
-from pathlib import Path
-from typing import Optional
+from functools import cached_property
+from types import MappingProxyType
+from typing import Any, Mapping, Optional, Tuple
+from urllib.parse import quote
+
+import envs
+
+logger = logging.getLogger(__name__)
 
 
 class NeuralConfig:
@@ -11,178 +17,250 @@ class NeuralConfig:
     Compatible con despliegue en Kubernetes y Oracle Cloud Object Storage
     """
 
+    # (predicado de configuracion invalida, mensaje de error)
+    _VALIDATORS = (
+        (
+            lambda s: s.vault_enabled
+            and not all([s.db_name, s.db_user, s.db_write_host]),
+            "Configuracion de base de datos incompleta (vault mode)",
+        ),
+        (
+            lambda s: not s.vault_enabled
+            and not all([s.db_name, s.db_user, s.db_password, s.db_write_host]),
+            "Configuracion de base de datos incompleta",
+        ),
+        (
+            lambda s: s.storage_type == "oracle_cloud"
+            and not all([s.oracle_namespace, s.oracle_bucket_name]),
+            "Configuracion de Oracle Cloud Object Storage incompleta",
+        ),
+        (
+            lambda s: s.oracle_upload_concurrency < 1,
+            "ORACLE_UPLOAD_CONCURRENCY debe ser mayor o igual a 1",
+        ),
+        (
+            lambda s: not (1 <= s.db_min_connections <= s.db_max_connections <= 50),
+            "Configuracion de pool de conexiones invalida",
+        ),
+        (
+            lambda s: not (1 <= s.db_writer_workers < s.db_max_connections),
+            "DB_WRITER_WORKERS debe estar entre 1 y DB_MAX_CONNECTIONS - 1",
+        ),
+        (
+            lambda s: s.db_batch_max_size < 1 or s.db_batch_max_wait_ms < 0,
+            "Configuracion de lotes de inserts invalida",
+        ),
+        (
+            lambda s: s.max_inflight_events < 1,
+            "MAX_INFLIGHT_EVENTS debe ser mayor o igual a 1",
+        ),
+        (
+            lambda s: s.stats_rollup_refresh_sec < 1,
+            "STATS_ROLLUP_REFRESH_SEC debe ser mayor o igual a 1",
+        ),
+        (
+            lambda s: s.db_pool_strategy not in ("oltp", "burst"),
+            "DB_POOL_STRATEGY debe ser 'oltp' o 'burst'",
+        ),
+        (
+            lambda s: s.storage_type not in ("local", "oracle_cloud"),
+            "STORAGE_TYPE debe ser 'local' o 'oracle_cloud'",
+        ),
+    )
+
     def __init__(self):
         # Configuracion de Base de Datos - Endpoints separados de lectura y escritura
         self.db_name = self._get_env("DB_NAME")
         self.db_user = self._get_env("DB_USER")
 
         # OCI Vault para DB_PASSWORD (opcional - fallback a env var)
-        self.vault_id = os.environ.get("VAULT_ID", "")
-        self.secret_name_db_password = os.environ.get("SECRET_DB_PASSWORD", "")
-        self.vault_cache_ttl = int(os.environ.get("VAULT_CACHE_TTL_SEC", "86400"))
+        self.vault_id = envs.VAULT_ID
+        self.secret_name_db_password = envs.SECRET_DB_PASSWORD
+        self.vault_cache_ttl = envs.VAULT_CACHE_TTL_SEC
         self.vault_enabled = bool(self.vault_id and self.secret_name_db_password)
 
         if self.vault_enabled:
             # Se poblara desde OCI Vault antes de inicializar la BD
             self.db_password = ""
-            logging.info("Vault habilitado - DB_PASSWORD se obtendra de OCI Vault")
+            logger.info("Vault habilitado - DB_PASSWORD se obtendra de OCI Vault")
         else:
             self.db_password = self._get_env("DB_PASSWORD")
 
-        # Endpoint de lectura (para consultas)
-        self.db_read_host = os.environ.get(
-            "DB_READ_HOST", self._get_env("DB_WRITE_HOST")
-        )
-        self.db_read_port = int(
-            os.environ.get("DB_READ_PORT", os.environ.get("DB_WRITE_PORT", "5432"))
-        )
-
         # Endpoint de escritura (para inserts/updates)
         self.db_write_host = self._get_env("DB_WRITE_HOST")
-        self.db_write_port = int(os.environ.get("DB_WRITE_PORT", "5432"))
+        self.db_write_port = envs.DB_WRITE_PORT
 
-        # Configuracion del pool de conexiones
-        self.db_min_connections = int(os.environ.get("DB_MIN_CONNECTIONS", "5"))
-        self.db_max_connections = int(os.environ.get("DB_MAX_CONNECTIONS", "15"))
-        self.db_query_timeout = int(os.environ.get("DB_QUERY_TIMEOUT", "10"))
-        self.connection_timeout = int(os.environ.get("CONNECTION_TIMEOUT", "3"))
+        # Endpoint de lectura (para consultas)
+        self.db_read_host = envs.DB_READ_HOST
+        self.db_read_port = envs.DB_READ_PORT
+
+        # Configuracion del pool de conexiones (auto-dimensionado si no se define)
+        self.db_pool_strategy = envs.DB_POOL_STRATEGY  # 'oltp' o 'burst'
+        self.db_min_connections, self.db_max_connections = self._size_db_pool()
+        self.db_query_timeout = envs.DB_QUERY_TIMEOUT
+        self.connection_timeout = envs.CONNECTION_TIMEOUT
+        # Espera antes de cerrar pools reemplazados al rotar credenciales
+        self.db_pool_drain_sec = envs.DB_POOL_DRAIN_SEC
+        # Writers con conexion dedicada y lotes de inserts: tamano y espera maxima
+        self.db_writer_workers = envs.DB_WRITER_WORKERS
+        self.db_batch_max_size = envs.DB_BATCH_MAX_SIZE
+        self.db_batch_max_wait_ms = envs.DB_BATCH_MAX_WAIT_MS
+        # (min, max) por rol de pool; escritura mantiene al menos una conexion por writer
+        self.db_pool_sizes = {
+            "write": (
+                max(self.db_min_connections, self.db_writer_workers),
+                self.db_max_connections,
+            ),
+            "read": (self.db_min_connections, self.db_max_connections),
+        }
+
+        # Ingesta asincrona: eventos encolados sin esperar commit (sin event_id)
+        self.event_ingest_async = envs.EVENT_INGEST_ASYNC
+        self.max_inflight_events = envs.MAX_INFLIGHT_EVENTS
+
+        # Intervalo de refresco del rollup que alimenta /stats
+        self.stats_rollup_refresh_sec = envs.STATS_ROLLUP_REFRESH_SEC
 
         # Configuracion de Oracle Cloud Object Storage
-        self.storage_type = os.environ.get(
-            "STORAGE_TYPE", "local"
-        )  # 'local' o 'oracle_cloud'
-        self.oracle_namespace = os.environ.get("ORACLE_NAMESPACE", "")
-        self.oracle_bucket_name = os.environ.get(
-            "ORACLE_BUCKET_NAME", "webhook_cameras_prod"
-        )
-        self.oracle_region = os.environ.get("ORACLE_REGION", "us-ashburn-1")
-        self.oracle_auth_type = os.environ.get("ORACLE_AUTH_TYPE", "instance_principal")
+        self.storage_type = envs.STORAGE_TYPE  # 'local' o 'oracle_cloud'
+        self.oracle_namespace = envs.ORACLE_NAMESPACE
+        self.oracle_bucket_name = envs.ORACLE_BUCKET_NAME
+        self.oracle_region = envs.ORACLE_REGION
+        self.oracle_auth_type = envs.ORACLE_AUTH_TYPE
+        self.oracle_upload_concurrency = envs.ORACLE_UPLOAD_CONCURRENCY
 
         # Configuracion de Normalizacion de Placas
-        self.min_confidence_neural = float(
-            os.environ.get("MIN_CONFIDENCE_NEURAL", "85.0")
-        )
-        self.reject_foreign_plates = (
-            os.environ.get("REJECT_FOREIGN_PLATES", "true").lower() == "true"
-        )
-        self.max_ocr_corrections_neural = int(
-            os.environ.get("MAX_OCR_CORRECTIONS_NEURAL", "1")
-        )
+        self.min_confidence_neural = envs.MIN_CONFIDENCE_NEURAL
+        self.reject_foreign_plates = envs.REJECT_FOREIGN_PLATES
+        self.max_ocr_corrections_neural = envs.MAX_OCR_CORRECTIONS_NEURAL
 
         # Modo estricto: si es true, solo logs de rechazos; si es false, guarda rechazos en tabla de auditoria
-        self.strict_mode = os.environ.get("STRICT_MODE", "false").lower() == "true"
+        self.strict_mode = envs.STRICT_MODE
 
         # Configuracion de Evidencias
-        self.evidence_folder = os.environ.get("EVIDENCE_FOLDER", "evidencias_neural")
+        self.evidence_folder = envs.EVIDENCE_FOLDER
 
         # Configuracion de Workers
-        self.worker_id = os.environ.get("HOSTNAME", f"neural-webhook-{os.getpid()}")
-        self.node_name = os.environ.get("NODE_NAME", "unknown")
+        self.worker_id = envs.HOSTNAME
+        self.node_name = envs.NODE_NAME
 
         # Configuracion de Health Checks
-        self.health_check_interval = int(os.environ.get("HEALTH_CHECK_INTERVAL", "30"))
-        self.health_check_timeout = int(os.environ.get("HEALTH_CHECK_TIMEOUT", "5"))
+        self.health_check_interval = envs.HEALTH_CHECK_INTERVAL
+        self.health_check_timeout = envs.HEALTH_CHECK_TIMEOUT
 
         # Configuracion de Logging
-        self.log_level = os.environ.get("LOG_LEVEL", "INFO").upper()
+        self.log_level = envs.LOG_LEVEL
+        self.log_level_int = logging.getLevelName(self.log_level)
+        if not isinstance(self.log_level_int, int):
+            self.log_level_int = logging.INFO
 
-        # URLs de base de datos derivadas
-        self.database_write_url = self._build_database_url(
+        # URLs de base de datos derivadas: plantillas fijas, solo cambia el password
+        self._write_url_tmpl = self._database_url_template(
             self.db_write_host, self.db_write_port
         )
-        self.database_read_url = self._build_database_url(
+        self._read_url_tmpl = self._database_url_template(
             self.db_read_host, self.db_read_port
         )
-
-        # Crear directorios necesarios (solo si es almacenamiento local)
-        if self.storage_type == "local":
-            self._ensure_directories()
+        self._render_database_urls()
 
         # Validar configuracion critica
         self._validate_config()
 
     def _get_env(self, key: str) -> str:
-        """Obtiene variable de entorno con manejo de errores"""
-        value = os.environ.get(key)
+        """Obtiene variable de entorno requerida con manejo de errores"""
+        value = getattr(envs, key)
         if not value:
-            logging.error(f"Variable de entorno requerida faltante: {key}")
+            logger.error(f"Variable de entorno requerida faltante: {key}")
             sys.exit(1)
         return value
 
-    def _build_database_url(self, host: str, port: int) -> str:
-        """Construye URL de conexion PostgreSQL para asyncpg"""
-        return f"postgresql+asyncpg://{self.db_user}:{self.db_password}@{host}:{port}/{self.db_name}"
+    def _size_db_pool(self) -> Tuple[int, int]:
+        """
+        Dimensiona el pool de conexiones por proceso.
+        Valores explicitos del entorno tienen prioridad; si no, se derivan de vCPUs:
+        - oltp: pool pequeno y estable, max = 2 * cores + 1 (entre 4 y 20)
+        - burst: pool mas grande para rafagas, max = 4 * cores + 1 (entre 8 y 40)
+        """
+        cores = (
+            len(os.sched_getaffinity(0))
+            if hasattr(os, "sched_getaffinity")
+            else (os.cpu_count() or 1)
+        )
 
-    def _ensure_directories(self):
-        """Crear directorios necesarios (solo para almacenamiento local)"""
-        try:
-            evidence_path = Path(self.evidence_folder)
-            evidence_path.mkdir(exist_ok=True, parents=True)
+        if self.db_pool_strategy == "burst":
+            auto_max, auto_min = max(8, min(4 * cores + 1, 40)), 2
+        else:
+            auto_max, auto_min = max(4, min(2 * cores + 1, 20)), 5
+
+        max_connections = envs.DB_MAX_CONNECTIONS
+        if max_connections is None:
+            max_connections = auto_max
+        min_connections = envs.DB_MIN_CONNECTIONS
+        if min_connections is None:
+            min_connections = min(auto_min, max_connections)
+
+        logger.info(
+            f"Pool de BD: min={min_connections}, max={max_connections} "
+            f"(estrategia={self.db_pool_strategy}, cores={cores}, "
+            f"max {'explicito' if envs.DB_MAX_CONNECTIONS is not None else 'auto'})"
+        )
+        return min_connections, max_connections
 
-            logs_path = Path("logs")
-            logs_path.mkdir(exist_ok=True, parents=True)
+    def _database_url_template(self, host: str, port: int) -> str:
+        """Construye plantilla de URL PostgreSQL para asyncpg con {pw} pendiente"""
+        return (
+            f"postgresql+asyncpg://{self.db_user}:{{pw}}@{host}:{port}/{self.db_name}"
+        )
 
-        except Exception as e:
-            logging.warning(f"No se pudieron crear directorios: {e}")
+    def _render_database_urls(self) -> None:
+        """Sustituye el password (URL-encoded) en las plantillas de conexion"""
+        pw = quote(self.db_password, safe="")
+        self.database_write_url = self._write_url_tmpl.format(pw=pw)
+        self.database_read_url = self._read_url_tmpl.format(pw=pw)
 
     def _validate_config(self):
         """Validar configuracion critica"""
-        errors = []
-
-        if self.vault_enabled:
-            if not all([self.db_name, self.db_user, self.db_write_host]):
-                errors.append("Configuracion de base de datos incompleta (vault mode)")
-        else:
-            if not all(
-                [self.db_name, self.db_user, self.db_password, self.db_write_host]
-            ):
-                errors.append("Configuracion de base de datos incompleta")
-
-        if self.storage_type == "oracle_cloud":
-            if not all([self.oracle_namespace, self.oracle_bucket_name]):
-                errors.append("Configuracion de Oracle Cloud Object Storage incompleta")
-
-        if not (1 <= self.db_min_connections <= self.db_max_connections <= 50):
-            errors.append("Configuracion de pool de conexiones invalida")
-
-        if self.storage_type not in ["local", "oracle_cloud"]:
-            errors.append("STORAGE_TYPE debe ser 'local' o 'oracle_cloud'")
+        errors = [message for invalid, message in self._VALIDATORS if invalid(self)]
 
         if errors:
-            for error in errors:
-                logging.error(error)
+            logger.error("\n".join(errors))
             sys.exit(1)
 
-        logging.info("Validacion de configuracion completada exitosamente")
+        logger.info("Validacion de configuracion completada exitosamente")
 
     def update_db_password(self, db_password: str) -> None:
         """Actualiza DB_PASSWORD y reconstruye las URLs de conexion.
         Usado tras obtener la contrasena desde OCI Vault."""
         self.db_password = db_password
-        self.database_write_url = self._build_database_url(
-            self.db_write_host, self.db_write_port
-        )
-        self.database_read_url = self._build_database_url(
-            self.db_read_host, self.db_read_port
+        self._render_database_urls()
+        logger.info("DB password y URLs de conexion actualizados")
+
+    @cached_property
+    def database_info(self) -> Mapping[str, Any]:
+        """Informacion de configuracion de base de datos (cacheada, solo lectura)"""
+        return MappingProxyType(
+            {
+                "write_endpoint": f"{self.db_write_host}:{self.db_write_port}",
+                "read_endpoint": f"{self.db_read_host}:{self.db_read_port}",
+                "database": self.db_name,
+                "pool_config": MappingProxyType(
+                    {
+                        "min_connections": self.db_min_connections,
+                        "max_connections": self.db_max_connections,
+                        "strategy": self.db_pool_strategy,
+                        "query_timeout": self.db_query_timeout,
+                        "connection_timeout": self.connection_timeout,
+                        "writer_workers": self.db_writer_workers,
+                        "batch_max_size": self.db_batch_max_size,
+                        "batch_max_wait_ms": self.db_batch_max_wait_ms,
+                    }
+                ),
+            }
         )
-        logging.info("DB password y URLs de conexion actualizados")
-
-    def get_database_info(self) -> dict:
-        """Obtiene informacion de configuracion de base de datos"""
-        return {
-            "write_endpoint": f"{self.db_write_host}:{self.db_write_port}",
-            "read_endpoint": f"{self.db_read_host}:{self.db_read_port}",
-            "database": self.db_name,
-            "pool_config": {
-                "min_connections": self.db_min_connections,
-                "max_connections": self.db_max_connections,
-                "query_timeout": self.db_query_timeout,
-                "connection_timeout": self.connection_timeout,
-            },
-        }
 
-    def get_storage_info(self) -> dict:
-        """Obtiene informacion de configuracion de almacenamiento"""
+    @cached_property
+    def storage_info(self) -> Mapping[str, Any]:
+        """Informacion de configuracion de almacenamiento (cacheada, solo lectura)"""
         storage_info = {
             "type": self.storage_type,
             "evidence_folder": self.evidence_folder,
@@ -195,10 +273,11 @@ class NeuralConfig:
                     "bucket": self.oracle_bucket_name,
                     "region": self.oracle_region,
                     "auth_type": self.oracle_auth_type,
+                    "upload_concurrency": self.oracle_upload_concurrency,
                 }
             )
 
-        return storage_info
+        return MappingProxyType(storage_info)
 
     def get_plate_normalization_info(self) -> dict:
         """Obtiene informacion de configuracion de normalizacion de placas"""
@@ -213,12 +292,13 @@ class NeuralConfig:
         """Obtiene el endpoint nativo de Oracle Cloud Object Storage"""
         return f"https://objectstorage.{self.oracle_region}.oraclecloud.com"
 
+    @cached_property
     def is_kubernetes_environment(self) -> bool:
-        """Detecta si esta ejecutandose en Kubernetes"""
+        """Detecta si esta ejecutandose en Kubernetes (constante durante el proceso)"""
         return (
             os.path.exists("/var/run/secrets/kubernetes.io/serviceaccount")
             or os.environ.get("KUBERNETES_SERVICE_HOST") is not None
         )
 
     def __repr__(self):
-        return f"<NeuralConfig(worker_id='{self.worker_id}', storage='{self.storage_type}', k8s={self.is_kubernetes_environment()})>"
+        return f"<NeuralConfig(worker_id='{self.worker_id}', storage='{self.storage_type}', k8s={self.is_kubernetes_environment})>"
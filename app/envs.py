@@ -0,0 +1,130 @@
+"""
+Variables de entorno del microservicio Neural Webhook.
+
+Cada variable se declara una sola vez con su tipo y valor por defecto en
+``environment_variables``. El valor se parsea en el primer acceso
+(``envs.DB_MAX_CONNECTIONS``) y queda cacheado como valor Python plano;
+``reload()`` descarta el snapshot del entorno y la cache.
+"""
+
+import os
+from typing import Any, Callable, Dict, Optional
+
+_environ: Optional[Dict[str, str]] = None
+_values: Dict[str, Any] = {}
+
+# worker_id por defecto cuando HOSTNAME no esta definido (un getpid por proceso)
+_DEFAULT_WORKER_ID = f"neural-webhook-{os.getpid()}"
+
+
+def _snapshot() -> Dict[str, str]:
+    """Copia unica de os.environ; las lecturas posteriores son dict.get puros"""
+    global _environ
+    if _environ is None:
+        _environ = dict(os.environ)
+    return _environ
+
+
+def _str(key: str, default: str = "") -> str:
+    return _snapshot().get(key, default)
+
+
+def _int(key: str, default: str) -> int:
+    return int(_snapshot().get(key, default))
+
+
+def _optional_int(key: str) -> Optional[int]:
+    value = _snapshot().get(key)
+    return int(value) if value else None
+
+
+def _float(key: str, default: str) -> float:
+    return float(_snapshot().get(key, default))
+
+
+def _bool(key: str, default: str) -> bool:
+    return _snapshot().get(key, default).lower() == "true"
+
+
+environment_variables: Dict[str, Callable[[], Any]] = {
+    # Base de Datos (DB_NAME, DB_USER, DB_PASSWORD y DB_WRITE_HOST son requeridas)
+    "DB_NAME": lambda: _str("DB_NAME"),
+    "DB_USER": lambda: _str("DB_USER"),
+    "DB_PASSWORD": lambda: _str("DB_PASSWORD"),
+    "DB_WRITE_HOST": lambda: _str("DB_WRITE_HOST"),
+    "DB_WRITE_PORT": lambda: _int("DB_WRITE_PORT", "5432"),
+    "DB_READ_HOST": lambda: _str("DB_READ_HOST", _str("DB_WRITE_HOST")),
+    "DB_READ_PORT": lambda: _int("DB_READ_PORT", _str("DB_WRITE_PORT", "5432")),
+    # Pool de conexiones
+    # DB_MIN/MAX_CONNECTIONS sin definir -> auto-dimensionado segun DB_POOL_STRATEGY
+    "DB_MIN_CONNECTIONS": lambda: _optional_int("DB_MIN_CONNECTIONS"),
+    "DB_MAX_CONNECTIONS": lambda: _optional_int("DB_MAX_CONNECTIONS"),
+    "DB_POOL_STRATEGY": lambda: _str("DB_POOL_STRATEGY", "oltp").lower(),
+    "DB_QUERY_TIMEOUT": lambda: _int("DB_QUERY_TIMEOUT", "10"),
+    "CONNECTION_TIMEOUT": lambda: _int("CONNECTION_TIMEOUT", "3"),
+    "DB_POOL_DRAIN_SEC": lambda: _float("DB_POOL_DRAIN_SEC", "5"),
+    # Writers de inserts (conexiones dedicadas) y tamano de sus lotes
+    "DB_WRITER_WORKERS": lambda: _int("DB_WRITER_WORKERS", "1"),
+    "DB_BATCH_MAX_SIZE": lambda: _int("DB_BATCH_MAX_SIZE", "100"),
+    "DB_BATCH_MAX_WAIT_MS": lambda: _float("DB_BATCH_MAX_WAIT_MS", "5"),
+    # Ingesta asincrona de eventos: /events responde sin esperar el commit
+    "EVENT_INGEST_ASYNC": lambda: _bool("EVENT_INGEST_ASYNC", "false"),
+    "MAX_INFLIGHT_EVENTS": lambda: _int("MAX_INFLIGHT_EVENTS", "1000"),
+    # Estadisticas (refresco de neural_event_hourly / neural_plates_seen)
+    "STATS_ROLLUP_REFRESH_SEC": lambda: _int("STATS_ROLLUP_REFRESH_SEC", "30"),
+    # OCI Vault
+    "VAULT_ID": lambda: _str("VAULT_ID"),
+    "SECRET_DB_PASSWORD": lambda: _str("SECRET_DB_PASSWORD"),
+    "VAULT_CACHE_TTL_SEC": lambda: _int("VAULT_CACHE_TTL_SEC", "86400"),
+    # Oracle Cloud Object Storage
+    "STORAGE_TYPE": lambda: _str("STORAGE_TYPE", "local"),
+    "ORACLE_NAMESPACE": lambda: _str("ORACLE_NAMESPACE"),
+    "ORACLE_BUCKET_NAME": lambda: _str("ORACLE_BUCKET_NAME", "webhook_cameras_prod"),
+    "ORACLE_REGION": lambda: _str("ORACLE_REGION", "us-ashburn-1"),
+    "ORACLE_AUTH_TYPE": lambda: _str("ORACLE_AUTH_TYPE", "instance_principal"),
+    # Hilos dedicados a las llamadas bloqueantes del SDK de OCI
+    "ORACLE_UPLOAD_CONCURRENCY": lambda: _int("ORACLE_UPLOAD_CONCURRENCY", "64"),
+    # Normalizacion de placas
+    "MIN_CONFIDENCE_NEURAL": lambda: _float("MIN_CONFIDENCE_NEURAL", "85.0"),
+    "REJECT_FOREIGN_PLATES": lambda: _bool("REJECT_FOREIGN_PLATES", "true"),
+    "MAX_OCR_CORRECTIONS_NEURAL": lambda: _int("MAX_OCR_CORRECTIONS_NEURAL", "1"),
+    "STRICT_MODE": lambda: _bool("STRICT_MODE", "false"),
+    # Evidencias
+    "EVIDENCE_FOLDER": lambda: _str("EVIDENCE_FOLDER", "evidencias_neural"),
+    # Workers
+    "HOSTNAME": lambda: _str("HOSTNAME", _DEFAULT_WORKER_ID),
+    "NODE_NAME": lambda: _str("NODE_NAME", "unknown"),
+    # Health checks
+    "HEALTH_CHECK_INTERVAL": lambda: _int("HEALTH_CHECK_INTERVAL", "30"),
+    "HEALTH_CHECK_TIMEOUT": lambda: _int("HEALTH_CHECK_TIMEOUT", "5"),
+    # Servidor
+    "UVICORN_WORKERS": lambda: _int("UVICORN_WORKERS", "1"),
+    "ENABLE_CORS": lambda: _bool("ENABLE_CORS", "false"),
+    # Logging
+    "LOG_LEVEL": lambda: _str("LOG_LEVEL", "INFO").upper(),
+}
+
+
+def __getattr__(name: str) -> Any:
+    try:
+        return _values[name]
+    except KeyError:
+        pass
+
+    if name in environment_variables:
+        value = environment_variables[name]()
+        _values[name] = value
+        return value
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return list(environment_variables.keys())
+
+
+def reload() -> None:
+    """Descarta el snapshot del entorno y los valores parseados"""
+    global _environ
+    _environ = None
+    _values.clear()
@@ -1,44 +1,107 @@
+import asyncio
+import copy
 import logging
 import os
 import sys
+import time
 import traceback
 from contextlib import asynccontextmanager
 from datetime import datetime, timezone
 from typing import Optional
 
+import msgspec
 import uvicorn
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, PlainTextResponse
+
+try:
+    import uvloop  # noqa: F401
+
+    uvloop_available = True
+except ImportError:  # p.ej. Windows
+    uvloop_available = False
+
+try:
+    import httptools  # noqa: F401
+
+    httptools_available = True
+except ImportError:
+    httptools_available = False
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "app"))
 
+import envs
 from config import NeuralConfig
+from models.responses import WebhookResponse
 from services.database_service import NeuralDatabaseService
 from services.event_processor import NeuralEventProcessor
+from services.storage_service import NeuralStorageService
 from services.vault_secret_provider import VaultSecretProvider
 
 
-def setup_logging(config: NeuralConfig):
-    """Configura el sistema de logging"""
-    log_format = "%(asctime)s - %(name)s - %(levelname)s - [%(filename)s:%(lineno)d] - %(message)s"
+class LazyFileHandler(logging.FileHandler):
+    """FileHandler que crea el directorio y abre el archivo en el primer emit"""
+
+    def __init__(self, filename: str):
+        super().__init__(filename, delay=True)
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
+
 
+LOG_FORMAT = (
+    "%(asctime)s - %(name)s - %(levelname)s - [%(filename)s:%(lineno)d] - %(message)s"
+)
+
+
+def _build_log_handlers(config: NeuralConfig) -> list:
+    """Handlers de logging: consola siempre, archivo (lazy) fuera de Kubernetes"""
     handlers = [logging.StreamHandler()]
 
-    if not config.is_kubernetes_environment():
-        os.makedirs("logs", exist_ok=True)
-        handlers.append(logging.FileHandler("logs/neural-webhook.log"))
+    if not config.is_kubernetes_environment:
+        handlers.append(LazyFileHandler("logs/neural-webhook.log"))
+
+    return handlers
+
+
+def setup_logging(config: NeuralConfig):
+    """Configura el sistema de logging (idempotente: no reemplaza handlers existentes)"""
+    root = logging.getLogger()
+    if root.hasHandlers():
+        root.setLevel(config.log_level_int)
+        return
 
     logging.basicConfig(
-        level=getattr(logging, config.log_level),
-        format=log_format,
-        handlers=handlers,
-        force=True,
+        level=config.log_level_int,
+        format=LOG_FORMAT,
+        handlers=_build_log_handlers(config),
     )
 
 
 logger = logging.getLogger(__name__)
 
+# Antiguedad maxima del health cacheado para /ready (mas estricto que /health)
+READY_HEALTH_MAX_AGE = 2.0
+
+# Encoder de las respuestas de /events (Structs de models.responses)
+_RESPONSE_ENCODER = msgspec.json.Encoder()
+
+# Cache del timestamp ISO con granularidad de 1 segundo: [epoch_sec, isoformat]
+_ts_cache = [0, ""]
+
+
+def now_iso() -> str:
+    """Timestamp UTC ISO-8601 cacheado por segundo para respuestas de endpoints"""
+    t = int(time.time())
+    cache = _ts_cache
+    if cache[0] != t:
+        cache[1] = datetime.fromtimestamp(t, timezone.utc).isoformat()
+        cache[0] = t
+    return cache[1]
+
+
 # Variables globales
 db_service: Optional[NeuralDatabaseService] = None
 event_processor: Optional[NeuralEventProcessor] = None
@@ -56,8 +119,12 @@ class NeuralWebhookService:
         self.config = config
         self.db_service = None
         self.event_processor = None
+        self.storage_service = None
         self.vault_provider = None
+        self._vault_refresh_lock = asyncio.Lock()
+        self._pw_generation = 0
         self._health_status = {"status": "starting", "services": {}}
+        self._health_cache = (0.0, None)  # (monotonic, processor health)
 
         if self.config.vault_enabled:
             self.vault_provider = VaultSecretProvider(
@@ -69,7 +136,7 @@ class NeuralWebhookService:
         logger.info(f"Inicializando Neural Webhook Service v1.0.0")
         logger.info(f"Worker ID: {self.config.worker_id}")
         logger.info(
-            f"Environment: {'Kubernetes' if self.config.is_kubernetes_environment() else 'Local'}"
+            f"Environment: {'Kubernetes' if self.config.is_kubernetes_environment else 'Local'}"
         )
         logger.info(f"Storage Type: {self.config.storage_type}")
 
@@ -77,31 +144,72 @@ class NeuralWebhookService:
             logger.info(f"Oracle Cloud - Bucket: {self.config.oracle_bucket_name}")
             logger.info(f"Oracle Cloud - Region: {self.config.oracle_region}")
 
+        # Porciones inmutables de las respuestas; cada request solo agrega timestamp
+        self.root_response = {
+            "service": "Neural Camera Webhook",
+            "version": "1.0.0",
+            "status": "active",
+            "worker_id": self.config.worker_id,
+            "storage_type": self.config.storage_type,
+            "bucket": self.config.oracle_bucket_name,
+        }
+        self.ready_response = {
+            "status": "ready",
+            "storage_type": self.config.storage_type,
+            "bucket": self.config.oracle_bucket_name,
+        }
+        database_info = self.config.database_info
+        self.configuracion_response = {
+            "database": {
+                **database_info,
+                "pool_config": dict(database_info["pool_config"]),
+            },
+            "storage": dict(self.config.storage_info),
+            "worker_id": self.config.worker_id,
+            "node_name": self.config.node_name,
+            "kubernetes": self.config.is_kubernetes_environment,
+            "log_level": self.config.log_level,
+            "cors_enabled": envs.ENABLE_CORS,
+            "version": "1.0.0",
+        }
+
     async def _handle_db_auth_error(self, exc: Exception) -> bool:
         """Callback invocado cuando una operacion de BD falla por autenticacion.
-        Refresca la contrasena desde vault y recrea los pools."""
+        Refresca la contrasena desde vault y recrea los pools. Solo el primer
+        llamador de una rafaga refresca; el resto espera el lock y reutiliza
+        el resultado (detectado via _pw_generation)."""
         if not self.vault_provider:
             return False
 
-        try:
-            logger.warning(f"Manejando error de autenticacion de BD: {exc}")
+        generation = self._pw_generation
+        async with self._vault_refresh_lock:
+            if generation != self._pw_generation:
+                logger.info("Credenciales de BD ya refrescadas por otra solicitud")
+                return True
 
-            self.vault_provider.invalidate_all()
+            try:
+                logger.warning(f"Manejando error de autenticacion de BD: {exc}")
 
-            db_password = await self.vault_provider.get_secret(
-                self.config.secret_name_db_password, force_refresh=True
-            )
+                self.vault_provider.invalidate_all()
 
-            self.config.update_db_password(db_password)
+                db_password = await self.vault_provider.get_secret(
+                    self.config.secret_name_db_password, force_refresh=True
+                )
 
-            await self.db_service.recreate_pools()
+                self.config.update_db_password(db_password)
+                await self.db_service.recreate_pools()
+                # Solo tras recrear los pools: si falla, los que esperan el lock
+                # reintentan el refresh en vez de usar los pools rotos
+                self._pw_generation += 1
 
-            logger.info("Credenciales de BD refrescadas y pools recreados exitosamente")
-            return True
+                logger.info(
+                    "Credenciales de BD refrescadas y pools recreados exitosamente"
+                )
+                return True
 
-        except Exception as refresh_e:
-            logger.error(f"Error refrescando credenciales de BD: {refresh_e}")
-            return False
+            except Exception as refresh_e:
+                logger.error(f"Error refrescando credenciales de BD: {refresh_e}")
+                return False
 
     async def initialize_services(self):
         """Inicializa los servicios"""
@@ -109,12 +217,24 @@ class NeuralWebhookService:
             # Obtener contrasena de BD desde OCI Vault si esta habilitado
             if self.vault_provider:
                 logger.info("Obteniendo DB_PASSWORD desde OCI Vault...")
-                self.vault_provider.initialize()
-                db_password = await self.vault_provider.get_secret(
-                    self.config.secret_name_db_password
-                )
+                try:
+                    self.vault_provider.initialize()
+                    db_password = await self.vault_provider.get_secret(
+                        self.config.secret_name_db_password
+                    )
+                    logger.info("DB_PASSWORD obtenido desde OCI Vault exitosamente")
+                except Exception as e:
+                    # Vault caido al arrancar: usar DB_PASSWORD del entorno si existe
+                    if not envs.DB_PASSWORD:
+                        raise
+                    logger.warning(
+                        "OCI Vault no disponible al arrancar (%s); usando "
+                        "DB_PASSWORD del entorno en lugar del secreto %s",
+                        e,
+                        self.config.secret_name_db_password,
+                    )
+                    db_password = envs.DB_PASSWORD
                 self.config.update_db_password(db_password)
-                logger.info("DB_PASSWORD obtenido desde OCI Vault exitosamente")
 
             logger.info("Inicializando servicio de base de datos...")
             self.db_service = NeuralDatabaseService(self.config)
@@ -125,12 +245,19 @@ class NeuralWebhookService:
             if self.vault_provider:
                 self.db_service.on_auth_error = self._handle_db_auth_error
 
+            # Un solo cliente de OCI (y firmador) por worker, compartido por los
+            # procesadores: la cache de tokens y las conexiones se reutilizan
+            logger.info("Inicializando servicio de almacenamiento...")
+            self.storage_service = NeuralStorageService(self.config)
+
             logger.info("Inicializando procesador de eventos...")
-            self.event_processor = NeuralEventProcessor(self.config, self.db_service)
+            self.event_processor = NeuralEventProcessor(
+                self.config, self.db_service, self.storage_service
+            )
             self._health_status["services"]["event_processor"] = "healthy"
 
             logger.info("Verificando servicio de almacenamiento...")
-            storage_health = await self.event_processor.storage_service.health_check()
+            storage_health = await self.storage_service.health_check()
             if storage_health.get("status") == "healthy":
                 self._health_status["services"]["storage"] = "healthy"
                 logger.info(f"Storage healthy: {storage_health.get('storage_type')}")
@@ -155,30 +282,53 @@ class NeuralWebhookService:
         """Cierra los servicios"""
         logger.info("Cerrando servicios...")
 
+        if self.storage_service:
+            await self.storage_service.close()
+
         if self.db_service:
             await self.db_service.close()
             self._health_status["services"]["database"] = "stopped"
 
+        if self.vault_provider:
+            await self.vault_provider.close()
+
         self._health_status["status"] = "stopped"
         logger.info("Servicios cerrados correctamente")
 
+    async def get_processor_health(self, max_age: float) -> dict:
+        """Health del procesador, cacheado hasta max_age segundos.
+        Solo se cachean resultados con storage saludable para que una caida se
+        refleje en el siguiente probe."""
+        now = time.monotonic()
+        cached_at, cached = self._health_cache
+        if cached is not None and now - cached_at < max_age:
+            return copy.deepcopy(cached)
+
+        health = await self.event_processor.health_check()
+        if health.get("storage", {}).get("status") == "healthy":
+            self._health_cache = (now, health)
+        return copy.deepcopy(health)
+
     def get_health_status(self) -> dict:
         """Obtiene el estado de salud del servicio"""
         return {
             **self._health_status,
             "worker_id": self.config.worker_id,
             "node_name": self.config.node_name,
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "timestamp": now_iso(),
         }
 
 
-service = NeuralWebhookService()
+# Se construye en el lifespan de cada worker (no al importar el modulo)
+service: Optional[NeuralWebhookService] = None
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Maneja el ciclo de vida de la aplicacion"""
+    global service
     try:
+        service = NeuralWebhookService()
         await service.initialize_services()
         logger.info("Aplicacion Neural Webhook iniciada")
         yield
@@ -186,7 +336,8 @@ async def lifespan(app: FastAPI):
         logger.error(f"Error durante startup: {e}", exc_info=True)
         raise
     finally:
-        await service.shutdown_services()
+        if service:
+            await service.shutdown_services()
         logger.info("Aplicacion Neural Webhook detenida")
 
 
@@ -195,15 +346,18 @@ app = FastAPI(
     description="Microservicio webhook para camaras Neural con ANPR y Oracle Cloud Storage",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+# Las camaras no envian preflight CORS; el middleware solo se instala si se habilita
+if envs.ENABLE_CORS:
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
 
 # ==================== ENDPOINTS ====================
 
@@ -212,20 +366,20 @@ app.add_middleware(
 async def root():
     """Endpoint raiz"""
     return {
-        "service": "Neural Camera Webhook",
-        "version": "1.0.0",
-        "status": "active",
-        "worker_id": config.worker_id if config else "unknown",
-        "storage_type": config.storage_type if config else "unknown",
-        "bucket": config.oracle_bucket_name if config else "unknown",
-        "timestamp": datetime.now(timezone.utc).isoformat(),
+        **service.root_response,
+        "timestamp": now_iso(),
     }
 
 
-@app.get("/metrics", tags=["Health"])
+@app.get("/metrics", tags=["Health"], response_class=PlainTextResponse)
 async def metrics():
-    """Endpoint de metricas"""
-    return "ok"
+    """Endpoint de metricas (formato de exposicion de Prometheus)"""
+    depth = db_service.ingest_queue_depth if db_service else 0
+    return (
+        "# HELP neural_webhook_ingest_queue_depth Eventos encolados sin persistir\n"
+        "# TYPE neural_webhook_ingest_queue_depth gauge\n"
+        f"neural_webhook_ingest_queue_depth {depth}\n"
+    )
 
 
 @app.post("/events", tags=["Webhook"])
@@ -242,26 +396,36 @@ async def receive_event(request: Request):
         logger.info("REQUEST RECIBIDO en /events")
         event_id, response_data = await event_processor.process_webhook_event(request)
 
-        logger.info(
-            f"Evento procesado: event_id={event_id}, status={response_data.get('status')}, "
-            f"created={response_data.get('events_created', 0)}, rejected={response_data.get('events_rejected', 0)}"
-        )
-
         # Siempre retornar HTTP 200 si el webhook proceso el request correctamente
         # La camara debe recibir 200 OK independientemente de si se acepto o rechazo la placa
-        status_code = 200 if response_data.get("status") == "ok" else 500
-
-        return JSONResponse(content=response_data, status_code=status_code)
+        if isinstance(response_data, WebhookResponse):
+            logger.info(
+                "Evento procesado: event_id=%s, status=ok, created=%d, rejected=%d",
+                event_id,
+                response_data.events_created,
+                response_data.events_rejected,
+            )
+            status_code = 200
+        else:
+            logger.info("Evento procesado: event_id=%s, status=error", event_id)
+            status_code = 500
+
+        # El Struct se codifica directo (sin dict intermedio ni validacion)
+        return Response(
+            content=_RESPONSE_ENCODER.encode(response_data),
+            status_code=status_code,
+            media_type="application/json",
+        )
 
     except Exception as e:
         logger.error(f"ERROR en webhook endpoint: {e}", exc_info=True)
         logger.error(f"Traceback completo:\n{traceback.format_exc()}")
-        return JSONResponse(
+        return ORJSONResponse(
             content={
                 "status": "error",
                 "error": str(e),
                 "traceback": traceback.format_exc(),
-                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "timestamp": now_iso(),
             },
             status_code=500,
         )
@@ -278,7 +442,9 @@ async def health_check():
     storage_health = None
     if event_processor:
         try:
-            processor_health = await event_processor.health_check()
+            processor_health = await service.get_processor_health(
+                max_age=config.health_check_interval / 2
+            )
             storage_health = processor_health.get("storage")
         except Exception as e:
             logger.warning(f"Error checking processor health: {e}")
@@ -288,9 +454,9 @@ async def health_check():
         "worker_id": health_status["worker_id"],
         "node_name": health_status["node_name"],
         "services": health_status["services"],
-        "total_events": event_processor.total_events_processed
-        if event_processor
-        else 0,
+        "total_events": (
+            event_processor.total_events_processed if event_processor else 0
+        ),
         "timestamp": health_status["timestamp"],
     }
 
@@ -308,7 +474,9 @@ async def readiness_check():
 
     storage_ready = False
     try:
-        processor_health = await event_processor.health_check()
+        processor_health = await service.get_processor_health(
+            max_age=READY_HEALTH_MAX_AGE
+        )
         storage_ready = processor_health.get("storage", {}).get("status") == "healthy"
     except Exception as e:
         logger.warning(f"Storage readiness check failed: {e}")
@@ -317,10 +485,8 @@ async def readiness_check():
         raise HTTPException(status_code=503, detail="Storage no disponible")
 
     return {
-        "status": "ready",
-        "storage_type": config.storage_type if config else "unknown",
-        "bucket": config.oracle_bucket_name if config else "unknown",
-        "timestamp": datetime.now(timezone.utc).isoformat(),
+        **service.ready_response,
+        "timestamp": now_iso(),
     }
 
 
@@ -338,7 +504,7 @@ async def get_eventos_recientes(limit: int = 10):
         return {
             "eventos": eventos,
             "total": len(eventos),
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "timestamp": now_iso(),
         }
     except Exception as e:
         logger.error(f"Error obteniendo eventos: {e}")
@@ -360,7 +526,7 @@ async def get_eventos_por_placa(plate: str, limit: int = 10):
             "plate": plate,
             "eventos": eventos,
             "total": len(eventos),
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "timestamp": now_iso(),
         }
     except Exception as e:
         logger.error(f"Error obteniendo eventos por placa: {e}")
@@ -377,16 +543,18 @@ async def get_estadisticas():
         stats = await db_service.get_event_stats()
 
         runtime_stats = {
-            "session_events": event_processor.total_events_processed
-            if event_processor
-            else 0,
-            "last_event_time": event_processor.last_event_time.isoformat()
-            if event_processor and event_processor.last_event_time
-            else None,
+            "session_events": (
+                event_processor.total_events_processed if event_processor else 0
+            ),
+            "last_event_time": (
+                event_processor.last_event_time.isoformat()
+                if event_processor and event_processor.last_event_time
+                else None
+            ),
             "worker_id": config.worker_id if config else "unknown",
             "storage_type": config.storage_type if config else "unknown",
             "bucket": config.oracle_bucket_name if config else "unknown",
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "timestamp": now_iso(),
         }
 
         return {**stats, **runtime_stats}
@@ -418,7 +586,7 @@ async def get_image_url(image_path: str, expires_in: int = 3600):
             "url": url,
             "expires_in": expires_in,
             "storage_type": config.storage_type if config else "unknown",
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "timestamp": now_iso(),
         }
     except HTTPException:
         raise
@@ -433,15 +601,7 @@ async def get_configuracion():
     if not config:
         raise HTTPException(status_code=503, detail="Configuracion no disponible")
 
-    return {
-        "database": config.get_database_info(),
-        "storage": config.get_storage_info(),
-        "worker_id": config.worker_id,
-        "node_name": config.node_name,
-        "kubernetes": config.is_kubernetes_environment(),
-        "log_level": config.log_level,
-        "version": "1.0.0",
-    }
+    return service.configuracion_response
 
 
 @app.get("/storage/test", tags=["Storage"])
@@ -472,7 +632,7 @@ async def test_storage():
             "test_presigned_url": image_url,
             "test_deleted": deleted,
             "health_check": health,
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "timestamp": now_iso(),
         }
 
     except Exception as e:
@@ -481,7 +641,7 @@ async def test_storage():
             "status": "error",
             "error": str(e),
             "storage_type": config.storage_type if config else "unknown",
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "timestamp": now_iso(),
         }
 
 
@@ -494,11 +654,15 @@ def main():
             "port": 8000,
             "log_level": "info",
             "access_log": True,
-            "loop": "asyncio",
+            "loop": "uvloop" if uvloop_available else "asyncio",
+            "http": "httptools" if httptools_available else "h11",
         }
 
+        # uvicorn ignora workers con reload (un solo proceso que se recarga)
         if not os.environ.get("PRODUCTION", False):
             uvicorn_config["reload"] = True
+        else:
+            uvicorn_config["workers"] = envs.UVICORN_WORKERS
 
         logger.info("Iniciando servidor Neural Webhook en puerto 8000...")
         uvicorn.run(**uvicorn_config)
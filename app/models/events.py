@@ -0,0 +1,70 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Optional
+
+
+@dataclass(slots=True)
+class EventRow:
+    """
+    Fila de detected_plates_wh_devices construida una sola vez al procesar el
+    webhook. Los campos siguen el orden de columnas del INSERT de eventos.
+    """
+
+    plate: Optional[str] = None
+    image_url: Optional[str] = None
+    camera_brand: str = "neural"
+    camera_id: Optional[str] = None
+    camera_location: Optional[str] = None
+    violation_type: Optional[str] = None
+    vehicle_type: Optional[str] = None
+    direction: Optional[str] = None
+    confidence: Optional[float] = None
+    capture_time: Optional[datetime] = None
+    raw_data: Any = None
+    ocr_correction_report: Optional[str] = None
+
+    def as_record(self) -> tuple:
+        """Parametros del INSERT / registro de COPY"""
+        return (
+            self.plate,
+            self.image_url,
+            self.camera_brand,
+            self.camera_id,
+            self.camera_location,
+            self.violation_type,
+            self.vehicle_type,
+            self.direction,
+            self.confidence,
+            self.capture_time,
+            self.raw_data,
+            self.ocr_correction_report,
+        )
+
+
+@dataclass(slots=True)
+class RejectedRow:
+    """Fila de rejected_plates_wh_cameras, en el orden de columnas del INSERT."""
+
+    camera_brand: str = "neural"
+    camera_id: Optional[str] = None
+    raw_plate_text: Optional[str] = None
+    confidence: Optional[float] = None
+    rejection_reason: Optional[str] = None
+    rejection_type: Optional[str] = None
+    country: Optional[str] = None
+    vehicle_type: Optional[str] = None
+    raw_data: Optional[str] = None
+
+    def as_record(self) -> tuple:
+        """Parametros del INSERT de rechazos"""
+        return (
+            self.camera_brand,
+            self.camera_id,
+            self.raw_plate_text,
+            self.confidence,
+            self.rejection_reason,
+            self.rejection_type,
+            self.country,
+            self.vehicle_type,
+            self.raw_data,
+        )
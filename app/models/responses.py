@@ -0,0 +1,48 @@
+from typing import Any, List, Optional, Union
+
+import msgspec
+from msgspec import UNSET, UnsetType
+
+
+class CreatedEvent(msgspec.Struct):
+    """Evento guardado (event_id es None con ingesta asincrona)"""
+
+    event_id: Optional[int]
+    image_urls: List[str]
+    normalized_plate: Optional[str]
+    ocr_corrections: int
+
+
+class RejectedEvent(msgspec.Struct):
+    """Placa rechazada por la normalizacion"""
+
+    raw_plate: Optional[str]
+    confidence: Optional[float]
+    rejection_reason: Optional[str]
+
+
+class WebhookResponse(msgspec.Struct):
+    """
+    Respuesta de /events. Se codifica directo a JSON con msgspec; events y
+    rejections se omiten (UNSET) cuando estan vacias.
+    """
+
+    status: str
+    events_created: int
+    events_rejected: int
+    plate: str
+    confidence: Any
+    capture_time: Any
+    camera_name: Any
+    total_events: int
+    timestamp: str
+    events: Union[List[CreatedEvent], UnsetType] = UNSET
+    rejections: Union[List[RejectedEvent], UnsetType] = UNSET
+
+
+class WebhookErrorResponse(msgspec.Struct):
+    """Respuesta de /events cuando el procesamiento falla"""
+
+    status: str
+    error: str
+    timestamp: str
@@ -1,14 +1,321 @@
 import asyncio
 import logging
-from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+import re
+from typing import Any, Dict, Final, List, Optional, Tuple, Union
 
 import asyncpg
 import asyncpg.exceptions
+import orjson
 from asyncpg import Pool
 
+from models.events import EventRow, RejectedRow
+
 logger = logging.getLogger(__name__)
 
+_AUTH_ERROR_TYPES = (
+    asyncpg.exceptions.InvalidPasswordError,
+    asyncpg.exceptions.InvalidAuthorizationSpecificationError,
+)
+# Cubre tambien "password authentication failed"
+_AUTH_ERROR_RE = re.compile(r"authentication failed", re.IGNORECASE)
+
+_EVENT_COLUMNS = (
+    "plate",
+    "image_url",
+    "camera_brand",
+    "camera_id",
+    "camera_location",
+    "violation_type",
+    "vehicle_type",
+    "direction",
+    "confidence",
+    "capture_time",
+    "raw_data",
+    "ocr_correction_report",
+)
+
+
+def _encode_jsonb(value: Any) -> bytes:
+    """Encoder binario de jsonb (version 1 + texto JSON). Acepta JSON ya
+    serializado (str o bytes) para no re-encodearlo como string JSON."""
+    if isinstance(value, bytes):
+        return b"\x01" + value
+    if isinstance(value, str):
+        return b"\x01" + value.encode()
+    return b"\x01" + orjson.dumps(value)
+
+
+def _decode_jsonb(data: bytes) -> Any:
+    return orjson.loads(data[1:])
+
+
+_INSERT_EVENT_SQL: Final[str] = """
+    INSERT INTO detected_plates_wh_devices (
+        plate, image_url, camera_brand, camera_id, camera_location,
+        violation_type, vehicle_type, direction, confidence,
+        capture_time, raw_data, ocr_correction_report
+    ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12)
+    RETURNING id
+"""
+
+_INSERT_REJECTED_SQL: Final[str] = """
+    INSERT INTO rejected_plates_wh_cameras (
+        camera_brand, camera_id, raw_plate_text, confidence,
+        rejection_reason, rejection_type, country, vehicle_type, raw_data
+    ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
+    RETURNING id
+"""
+
+_RECENT_EVENTS_SQL: Final[str] = """
+    SELECT id, plate, image_url, camera_brand, camera_id,
+           camera_location, violation_type, vehicle_type,
+           direction, NULLIF(confidence, 0) AS confidence, capture_time,
+           created_at, raw_data
+    FROM detected_plates_wh_devices
+    WHERE camera_brand = 'neural'
+    ORDER BY created_at DESC
+    LIMIT $1
+"""
+
+_EVENTS_BY_PLATE_SQL: Final[str] = """
+    SELECT id, plate, image_url, camera_brand, camera_id,
+           camera_location, violation_type, vehicle_type,
+           direction, NULLIF(confidence, 0) AS confidence, capture_time,
+           created_at, raw_data
+    FROM detected_plates_wh_devices
+    WHERE plate = $1 AND camera_brand = 'neural'
+    ORDER BY created_at DESC
+    LIMIT $2
+"""
+
+# Solo un worker aplica el esquema (DDL e indices) a la vez, bajo un advisory
+# lock de sesion; el resto espera sondeando y lo encuentra hecho
+_SCHEMA_LOCK_ID = 0x4E57444C
+_SCHEMA_LOCK_POLL_SEC = 0.5
+
+_SCHEMA_DDL: Final[str] = """
+    -- lock_timeout acota las esperas de locks de las tablas compartidas
+    SET LOCAL lock_timeout = '5s';
+
+    -- Tabla compartida con otros microservicios de webhooks
+    CREATE TABLE IF NOT EXISTS detected_plates_wh_devices (
+        id SERIAL PRIMARY KEY,
+        plate VARCHAR(20),
+        image_url VARCHAR(500),
+        camera_brand VARCHAR(20) NOT NULL,
+        camera_id VARCHAR(100),
+        camera_location VARCHAR(200),
+        violation_type VARCHAR(100),
+        vehicle_type VARCHAR(50),
+        direction VARCHAR(20),
+        confidence DECIMAL(6,4),
+        capture_time TIMESTAMP WITH TIME ZONE,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT (NOW() AT TIME ZONE 'UTC'),
+        raw_data JSONB,
+        ocr_correction_report TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_wh_devices_plate ON detected_plates_wh_devices(plate);
+    CREATE INDEX IF NOT EXISTS idx_wh_devices_camera_id ON detected_plates_wh_devices(camera_id);
+    CREATE INDEX IF NOT EXISTS idx_wh_devices_created_at ON detected_plates_wh_devices(created_at);
+    CREATE INDEX IF NOT EXISTS idx_wh_devices_camera_brand ON detected_plates_wh_devices(camera_brand);
+    CREATE INDEX IF NOT EXISTS idx_wh_devices_capture_time ON detected_plates_wh_devices(capture_time);
+
+    -- Tabla compartida de rechazos
+    CREATE TABLE IF NOT EXISTS rejected_plates_wh_cameras (
+        id SERIAL PRIMARY KEY,
+        camera_brand VARCHAR(20) NOT NULL,
+        camera_id VARCHAR(100),
+        raw_plate_text VARCHAR(50),
+        confidence DECIMAL(5,2),
+        rejection_reason TEXT NOT NULL,
+        rejection_type VARCHAR(50),
+        country VARCHAR(10),
+        vehicle_type VARCHAR(50),
+        raw_data TEXT,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT (NOW() AT TIME ZONE 'UTC')
+    );
+    CREATE INDEX IF NOT EXISTS idx_rejected_wh_brand_camera
+    ON rejected_plates_wh_cameras(camera_brand, camera_id, created_at DESC);
+    CREATE INDEX IF NOT EXISTS idx_rejected_wh_type
+    ON rejected_plates_wh_cameras(rejection_type);
+    CREATE INDEX IF NOT EXISTS idx_rejected_wh_confidence
+    ON rejected_plates_wh_cameras(confidence);
+
+    -- Agregados de get_event_stats: eventos neural por hora y placas distintas
+    -- vistas. Se pueblan aqui una sola vez; luego refresh_event_rollup solo
+    -- recalcula las horas desde el ultimo refresco (los borrados de filas
+    -- mas antiguas no se reflejan).
+    CREATE TABLE IF NOT EXISTS neural_event_hourly (
+        h TIMESTAMP WITH TIME ZONE PRIMARY KEY,
+        c BIGINT NOT NULL,
+        refreshed_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+    );
+    CREATE TABLE IF NOT EXISTS neural_plates_seen (
+        plate VARCHAR(20) PRIMARY KEY
+    );
+    INSERT INTO neural_event_hourly (h, c)
+    SELECT date_trunc('hour', created_at), COUNT(*)
+    FROM detected_plates_wh_devices
+    WHERE camera_brand = 'neural' AND created_at IS NOT NULL
+    GROUP BY 1
+    ON CONFLICT (h) DO UPDATE SET c = EXCLUDED.c;
+    INSERT INTO neural_plates_seen (plate)
+    SELECT DISTINCT plate
+    FROM detected_plates_wh_devices
+    WHERE camera_brand = 'neural' AND plate IS NOT NULL AND plate != ''
+    ON CONFLICT DO NOTHING;
+"""
+
+# Objetos que crea _SCHEMA_DDL; si todos existen el DDL se omite. Al agregar
+# un objeto al DDL, agregarlo aqui para que las BD existentes lo reciban.
+_SCHEMA_OBJECTS = (
+    "detected_plates_wh_devices",
+    "rejected_plates_wh_cameras",
+    "neural_event_hourly",
+    "neural_plates_seen",
+)
+
+# Indices parciales alineados con get_recent_events / get_events_by_plate:
+# filtro camera_brand='neural' + orden created_at DESC sin sort, y las
+# columnas proyectadas (salvo raw_data) incluidas en el indice. La tabla es
+# compartida: CONCURRENTLY no bloquea a los escritores durante la construccion,
+# pero no admite transaccion, asi que van fuera de _SCHEMA_DDL, una sentencia
+# por indice.
+_CONCURRENT_INDEXES: Final[Dict[str, str]] = {
+    "idx_wh_neural_recent": """
+        CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_wh_neural_recent
+        ON detected_plates_wh_devices(created_at DESC)
+        INCLUDE (id, plate, confidence, capture_time, camera_id,
+                 camera_location, image_url, vehicle_type,
+                 direction, violation_type)
+        WHERE camera_brand = 'neural'
+    """,
+    "idx_wh_neural_plate": """
+        CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_wh_neural_plate
+        ON detected_plates_wh_devices(plate, created_at DESC)
+        INCLUDE (id, confidence, capture_time, camera_id,
+                 camera_location, image_url, vehicle_type,
+                 direction, violation_type)
+        WHERE camera_brand = 'neural'
+    """,
+}
+
+# Existe y, si es indice, es valido (un CONCURRENTLY interrumpido lo deja INVALID)
+_SCHEMA_PROBE_SQL: Final[str] = """
+    SELECT bool_and(
+        to_regclass(name) IS NOT NULL
+        AND COALESCE(
+            (SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(name)),
+            TRUE
+        )
+    )
+    FROM unnest($1::text[]) AS name
+"""
+
+_INVALID_INDEX_SQL: Final[str] = """
+    SELECT EXISTS (
+        SELECT 1 FROM pg_index
+        WHERE indexrelid = to_regclass($1) AND NOT indisvalid
+    )
+"""
+
+# Recalcula por hora desde el ultimo refresco (marca: refreshed_at de la hora
+# mas reciente, menos una hora de margen para commits tardios) y como minimo
+# las dos ultimas horas; si el refresco estuvo caido, la siguiente ejecucion
+# cubre todo el hueco. Cada hora del rango se escribe aunque tenga 0 eventos,
+# asi la hora en curso siempre lleva la marca. Sin marca (tabla vacia) parte
+# del primer evento neural. Si otro worker refresco hace menos de $1 segundos
+# la CTE since queda vacia y no escribe nada: con N workers se hace ~1
+# refresco por intervalo. Un refresco duplicado por carrera es inocuo.
+_REFRESH_EVENT_ROLLUP_SQL: Final[str] = """
+    WITH since AS (
+        SELECT LEAST(
+            date_trunc('hour', NOW()) - INTERVAL '1 hour',
+            COALESCE(
+                (SELECT date_trunc('hour', refreshed_at) - INTERVAL '1 hour'
+                 FROM neural_event_hourly ORDER BY h DESC LIMIT 1),
+                (SELECT date_trunc('hour', MIN(created_at))
+                 FROM detected_plates_wh_devices WHERE camera_brand = 'neural')
+            )
+        ) AS h
+        WHERE NOT EXISTS (
+            SELECT 1 FROM neural_event_hourly
+            WHERE h = date_trunc('hour', NOW())
+              AND refreshed_at > NOW() - make_interval(secs => $1)
+        )
+    ), recent AS (
+        SELECT created_at, plate
+        FROM detected_plates_wh_devices, since
+        WHERE camera_brand = 'neural' AND created_at >= since.h
+    ), new_plates AS (
+        INSERT INTO neural_plates_seen (plate)
+        SELECT DISTINCT plate FROM recent WHERE plate IS NOT NULL AND plate != ''
+        ON CONFLICT DO NOTHING
+    ), counts AS (
+        SELECT date_trunc('hour', created_at) AS h, COUNT(*) AS c
+        FROM recent
+        GROUP BY 1
+    )
+    INSERT INTO neural_event_hourly (h, c, refreshed_at)
+    SELECT hours.h, COALESCE(counts.c, 0), NOW()
+    FROM since
+    CROSS JOIN LATERAL generate_series(
+        since.h, date_trunc('hour', NOW()), INTERVAL '1 hour'
+    ) AS hours(h)
+    LEFT JOIN counts ON counts.h = hours.h
+    ON CONFLICT (h) DO UPDATE
+    SET c = EXCLUDED.c, refreshed_at = EXCLUDED.refreshed_at
+"""
+
+# Totales desde neural_event_hourly (una fila por hora); events_last_hour es
+# exacto: range scan corto sobre el indice parcial idx_wh_neural_recent
+_EVENT_COUNTS_SQL: Final[str] = """
+    SELECT
+        COALESCE(SUM(c), 0)::bigint as total_events,
+        COALESCE(SUM(c) FILTER (WHERE h >= date_trunc('day', NOW())), 0)::bigint
+            as events_today,
+        (
+            SELECT COUNT(*)
+            FROM detected_plates_wh_devices
+            WHERE camera_brand = 'neural'
+              AND created_at >= NOW() - INTERVAL '1 hour'
+        ) as events_last_hour
+    FROM neural_event_hourly
+"""
+
+# Index-only scan sobre la PK de neural_plates_seen (una fila por placa)
+_UNIQUE_PLATES_SQL: Final[str] = """
+    SELECT COUNT(*) as unique_plates
+    FROM neural_plates_seen
+"""
+
+# Ajuste por rol de pool. Escritura: las conexiones extra (reintentos, DDL,
+# lotes) se cierran pronto porque los writers ya retienen las suyas; pocos
+# statements, cache de asyncpg por defecto. Lectura: cache de statements
+# (por conexion) mas grande y que admite consultas mas largas.
+_POOL_ROLE_SETTINGS = {
+    "write": {
+        "max_inactive_lifetime": 60.0,
+        "statement_cache_size": 100,
+        "max_cacheable_statement_size": 15 * 1024,
+        # created_at usa DEFAULT (NOW() AT TIME ZONE 'UTC'): requiere sesion en UTC
+        "server_settings": {"timezone": "UTC"},
+    },
+    "read": {
+        "max_inactive_lifetime": 300.0,
+        "statement_cache_size": 2048,
+        "max_cacheable_statement_size": 32 * 1024,
+        "server_settings": {},
+    },
+}
+
+# A partir de este tamano save_events_batch usa COPY en lugar de executemany
+_COPY_MIN_ROWS = 50
+
+# Marca de fin en las colas de writers/ingesta: el consumidor que la toma
+# termina su lote actual y se detiene (sin cancelarlo a mitad de lote)
+_STOP = object()
+
 
 class NeuralDatabaseService:
     """
@@ -22,59 +329,120 @@ class NeuralDatabaseService:
         self._tables_ensured = False
         self._total_events = 0
         self.on_auth_error = None  # Callable[[Exception], Awaitable[bool]]
+        # Writers de larga vida para inserts (se inician en initialize)
+        self._write_queue: Optional[asyncio.Queue] = None
+        self._writer_tasks: List[asyncio.Task] = []
+        self._rollup_task: Optional[asyncio.Task] = None
+        # Cierres diferidos de pools reemplazados por recreate_pools
+        self._drain_tasks: set = set()
+        # Ingesta fire-and-forget (save_event_async), acotada por max_inflight_events
+        self._ingest_queue: Optional[asyncio.Queue] = None
+        self._ingest_task: Optional[asyncio.Task] = None
+        # kind -> (SQL de insert, constructor de fila, callback de exito)
+        self._write_ops = {
+            "event": (_INSERT_EVENT_SQL, EventRow.as_record, self._on_event_saved),
+            "rejected": (
+                _INSERT_REJECTED_SQL,
+                RejectedRow.as_record,
+                self._on_rejected_saved,
+            ),
+        }
 
     @staticmethod
     def is_auth_error(exc: Exception) -> bool:
         """Detecta si una excepcion es un error de autenticacion de BD."""
-        if isinstance(exc, asyncpg.exceptions.InvalidPasswordError):
-            return True
-        if isinstance(exc, asyncpg.exceptions.InvalidAuthorizationSpecificationError):
-            return True
-        error_msg = str(exc).lower()
-        if "password authentication failed" in error_msg:
-            return True
-        if "authentication failed" in error_msg:
-            return True
-        return False
+        return isinstance(exc, _AUTH_ERROR_TYPES) or bool(
+            _AUTH_ERROR_RE.search(str(exc))
+        )
+
+    def _read_conn(self):
+        """Checkout del pool de lectura; todas las consultas pasan por aqui"""
+        assert self.read_pool is not None, "read_pool no inicializado"
+        return self.read_pool.acquire()
+
+    def _write_conn(self):
+        """Checkout del pool de escritura; solo DDL e inserts pasan por aqui"""
+        assert self.write_pool is not None, "write_pool no inicializado"
+        return self.write_pool.acquire()
+
+    async def _prepare_write_connection(self, conn) -> None:
+        """Callback init del pool de escritura: raw_data (jsonb) se serializa
+        con orjson y viaja en formato binario, sin cast ::jsonb."""
+        await conn.set_type_codec(
+            "jsonb",
+            encoder=_encode_jsonb,
+            decoder=_decode_jsonb,
+            schema="pg_catalog",
+            format="binary",
+        )
+
+    async def _prepare_read_connection(self, conn) -> None:
+        """Callback init del pool de lectura: numeric (confidence) se decodifica
+        directo a float, sin pasar por Decimal."""
+        await conn.set_type_codec(
+            "numeric",
+            encoder=str,
+            decoder=float,
+            schema="pg_catalog",
+            format="text",
+        )
+
+    async def _make_pool(self, role: str) -> Pool:
+        """Crea el pool de `role` ('write' o 'read') con su ajuste por rol."""
+        settings = _POOL_ROLE_SETTINGS[role]
+        min_size, max_size = self.config.db_pool_sizes[role]
+        return await asyncpg.create_pool(
+            host=getattr(self.config, f"db_{role}_host"),
+            port=getattr(self.config, f"db_{role}_port"),
+            user=self.config.db_user,
+            password=self.config.db_password,
+            database=self.config.db_name,
+            min_size=min_size,
+            max_size=max_size,
+            command_timeout=self.config.db_query_timeout,
+            max_inactive_connection_lifetime=settings["max_inactive_lifetime"],
+            init=getattr(self, f"_prepare_{role}_connection"),
+            statement_cache_size=settings["statement_cache_size"],
+            max_cacheable_statement_size=settings["max_cacheable_statement_size"],
+            server_settings={
+                "application_name": f"neural_webhook_{role}_{self.config.worker_id}",
+                # JIT no compensa en consultas OLTP cortas y encarece re-planificar
+                "jit": "off",
+                **settings["server_settings"],
+            },
+        )
+
+    async def _make_pools(self) -> Tuple[Pool, Pool]:
+        """Crea los pools de escritura y lectura en paralelo. Si uno falla, cierra
+        el que si se creo antes de propagar el error."""
+        write_pool, read_pool = await asyncio.gather(
+            self._make_pool("write"), self._make_pool("read"), return_exceptions=True
+        )
+        errors = [p for p in (write_pool, read_pool) if isinstance(p, BaseException)]
+        if errors:
+            for pool in (write_pool, read_pool):
+                if not isinstance(pool, BaseException):
+                    await pool.close()
+            raise errors[0]
+        return write_pool, read_pool
 
     async def initialize(self):
         """Initialize database connection pools"""
         try:
-            # Create write connection pool
-            self.write_pool = await asyncpg.create_pool(
-                host=self.config.db_write_host,
-                port=self.config.db_write_port,
-                user=self.config.db_user,
-                password=self.config.db_password,
-                database=self.config.db_name,
-                min_size=self.config.db_min_connections,
-                max_size=self.config.db_max_connections,
-                command_timeout=self.config.db_query_timeout,
-                server_settings={
-                    "application_name": f"neural_webhook_write_{self.config.worker_id}"
-                },
-            )
-            logger.info(f"Created write connection pool to {self.config.db_write_host}")
-
-            # Create read connection pool
-            self.read_pool = await asyncpg.create_pool(
-                host=self.config.db_read_host,
-                port=self.config.db_read_port,
-                user=self.config.db_user,
-                password=self.config.db_password,
-                database=self.config.db_name,
-                min_size=self.config.db_min_connections,
-                max_size=self.config.db_max_connections,
-                command_timeout=self.config.db_query_timeout,
-                server_settings={
-                    "application_name": f"neural_webhook_read_{self.config.worker_id}"
-                },
+            self.write_pool, self.read_pool = await self._make_pools()
+            logger.info(
+                f"Created connection pools: write={self.config.db_write_host}, "
+                f"read={self.config.db_read_host}"
             )
-            logger.info(f"Created read connection pool to {self.config.db_read_host}")
 
             # Ensure tables exist
             await self.ensure_tables_exist()
 
+            self._start_writers()
+            self._ingest_queue = asyncio.Queue(maxsize=self.config.max_inflight_events)
+            self._ingest_task = asyncio.create_task(self._ingest_loop())
+            self._rollup_task = asyncio.create_task(self._event_rollup_loop())
+
         except Exception as e:
             logger.error(f"Failed to initialize database service: {e}")
             raise
@@ -85,81 +453,20 @@ class NeuralDatabaseService:
             return
 
         try:
-            async with self.write_pool.acquire() as conn:
-                # Create detected_plates_wh_devices table (shared with other microservices)
-                logger.info("Ensuring detected_plates_wh_devices table exists...")
-                await conn.execute("""
-                    CREATE TABLE IF NOT EXISTS detected_plates_wh_devices (
-                        id SERIAL PRIMARY KEY,
-                        plate VARCHAR(20),
-                        image_url VARCHAR(500),
-                        camera_brand VARCHAR(20) NOT NULL,
-                        camera_id VARCHAR(100),
-                        camera_location VARCHAR(200),
-                        violation_type VARCHAR(100),
-                        vehicle_type VARCHAR(50),
-                        direction VARCHAR(20),
-                        confidence DECIMAL(6,4),
-                        capture_time TIMESTAMP WITH TIME ZONE,
-                        created_at TIMESTAMP WITH TIME ZONE DEFAULT (NOW() AT TIME ZONE 'UTC'),
-                        raw_data JSONB,
-                        ocr_correction_report TEXT
-                    )
-                """)
-
-                # Create indexes (IF NOT EXISTS for shared table)
-                await conn.execute(
-                    "CREATE INDEX IF NOT EXISTS idx_wh_devices_plate ON detected_plates_wh_devices(plate)"
-                )
-                await conn.execute(
-                    "CREATE INDEX IF NOT EXISTS idx_wh_devices_camera_id ON detected_plates_wh_devices(camera_id)"
-                )
-                await conn.execute(
-                    "CREATE INDEX IF NOT EXISTS idx_wh_devices_created_at ON detected_plates_wh_devices(created_at)"
-                )
-                await conn.execute(
-                    "CREATE INDEX IF NOT EXISTS idx_wh_devices_camera_brand ON detected_plates_wh_devices(camera_brand)"
-                )
-                await conn.execute(
-                    "CREATE INDEX IF NOT EXISTS idx_wh_devices_capture_time ON detected_plates_wh_devices(capture_time)"
-                )
-
-                logger.info(
-                    "detected_plates_wh_devices table and indexes ensured successfully"
-                )
-
-                # Tabla compartida de rechazos (protegida con IF NOT EXISTS)
-                logger.info("Ensuring rejected_plates_wh_cameras table exists...")
-                await conn.execute("""
-                    CREATE TABLE IF NOT EXISTS rejected_plates_wh_cameras (
-                        id SERIAL PRIMARY KEY,
-                        camera_brand VARCHAR(20) NOT NULL,
-                        camera_id VARCHAR(100),
-                        raw_plate_text VARCHAR(50),
-                        confidence DECIMAL(5,2),
-                        rejection_reason TEXT NOT NULL,
-                        rejection_type VARCHAR(50),
-                        country VARCHAR(10),
-                        vehicle_type VARCHAR(50),
-                        raw_data TEXT,
-                        created_at TIMESTAMP WITH TIME ZONE DEFAULT (NOW() AT TIME ZONE 'UTC')
-                    )
-                """)
-
-                await conn.execute("""
-                    CREATE INDEX IF NOT EXISTS idx_rejected_wh_brand_camera
-                    ON rejected_plates_wh_cameras(camera_brand, camera_id, created_at DESC)
-                """)
-                await conn.execute("""
-                    CREATE INDEX IF NOT EXISTS idx_rejected_wh_type
-                    ON rejected_plates_wh_cameras(rejection_type)
-                """)
-                await conn.execute("""
-                    CREATE INDEX IF NOT EXISTS idx_rejected_wh_confidence
-                    ON rejected_plates_wh_cameras(confidence)
-                """)
-
-                logger.info("rejected_plates_wh_cameras table ensured successfully")
+            async with self._write_conn() as conn:
+                # Esquema ya creado (otro worker o arranque previo): sin DDL ni locks
+                if await conn.fetchval(
+                    _SCHEMA_PROBE_SQL, _SCHEMA_OBJECTS + tuple(_CONCURRENT_INDEXES)
+                ):
+                    logger.info("Neural webhook schema already present, skipping DDL")
+                else:
+                    await self._acquire_schema_lock(conn)
+                    try:
+                        await self._apply_schema(conn)
+                    finally:
+                        await conn.execute(
+                            "SELECT pg_advisory_unlock($1)", _SCHEMA_LOCK_ID
+                        )
 
             self._tables_ensured = True
 
@@ -167,87 +474,318 @@ class NeuralDatabaseService:
             logger.error(f"Error ensuring tables exist: {e}")
             raise
 
+    @staticmethod
+    async def _acquire_schema_lock(conn) -> None:
+        """Toma el lock de esquema sondeando con pg_try_advisory_lock: una sesion
+        bloqueada en pg_advisory_lock retendria un snapshot, y el CREATE INDEX
+        CONCURRENTLY del worker que tiene el lock esperaria por ella (deadlock)."""
+        while not await conn.fetchval(
+            "SELECT pg_try_advisory_lock($1)", _SCHEMA_LOCK_ID
+        ):
+            await asyncio.sleep(_SCHEMA_LOCK_POLL_SEC)
+
+    async def _apply_schema(self, conn) -> None:
+        """Aplica lo que falte del esquema (con el lock de esquema tomado): el
+        DDL en una transaccion y despues los indices CONCURRENTLY."""
+        if not await conn.fetchval(_SCHEMA_PROBE_SQL, _SCHEMA_OBJECTS):
+            logger.info("Ensuring Neural webhook schema exists...")
+            # Todo el DDL en un solo round-trip (protocolo simple) y una transaccion
+            async with conn.transaction():
+                await conn.execute(_SCHEMA_DDL, timeout=None)
+
+            logger.info(
+                "detected_plates_wh_devices, rejected_plates_wh_cameras and "
+                "stats rollups ensured successfully"
+            )
+
+        if not await conn.fetchval(_SCHEMA_PROBE_SQL, list(_CONCURRENT_INDEXES)):
+            await self._create_concurrent_indexes(conn)
+
+    @staticmethod
+    async def _create_concurrent_indexes(conn) -> None:
+        """Construye los indices de lectura sin bloquear la tabla compartida. Son
+        una optimizacion: si la construccion falla el arranque sigue y el
+        siguiente lo reintenta."""
+        try:
+            for name, sql in _CONCURRENT_INDEXES.items():
+                # Un CONCURRENTLY interrumpido deja el indice INVALID: se rehace
+                if await conn.fetchval(_INVALID_INDEX_SQL, name):
+                    await conn.execute(
+                        f"DROP INDEX CONCURRENTLY IF EXISTS {name}", timeout=None
+                    )
+                logger.info("Creando indice %s (CONCURRENTLY)...", name)
+                await conn.execute(sql, timeout=None)
+        except Exception as e:
+            logger.warning("Error creando indices de lectura: %s", e)
+
     async def recreate_pools(self) -> None:
-        """Cierra pools existentes y crea nuevos con las credenciales actuales del config.
+        """Crea pools nuevos con las credenciales actuales del config, los
+        intercambia por los existentes y cierra los anteriores en segundo plano
+        tras db_pool_drain_sec, sin cortar consultas en curso.
         Usado tras refrescar la contrasena desde OCI Vault."""
         logger.info("Recreando pools de conexion con credenciales actualizadas...")
 
-        if self.write_pool:
-            await self.write_pool.close()
-            logger.info("Pool de escritura anterior cerrado")
-        if self.read_pool:
-            await self.read_pool.close()
-            logger.info("Pool de lectura anterior cerrado")
-
-        self.write_pool = await asyncpg.create_pool(
-            host=self.config.db_write_host,
-            port=self.config.db_write_port,
-            user=self.config.db_user,
-            password=self.config.db_password,
-            database=self.config.db_name,
-            min_size=self.config.db_min_connections,
-            max_size=self.config.db_max_connections,
-            command_timeout=self.config.db_query_timeout,
-            server_settings={
-                "application_name": f"neural_webhook_write_{self.config.worker_id}"
-            },
+        new_write, new_read = await self._make_pools()
+        logger.info(
+            "Nuevos pools creados: escritura=%s, lectura=%s",
+            self.config.db_write_host,
+            self.config.db_read_host,
         )
-        logger.info(f"Nuevo pool de escritura creado para {self.config.db_write_host}")
 
-        self.read_pool = await asyncpg.create_pool(
-            host=self.config.db_read_host,
-            port=self.config.db_read_port,
-            user=self.config.db_user,
-            password=self.config.db_password,
-            database=self.config.db_name,
-            min_size=self.config.db_min_connections,
-            max_size=self.config.db_max_connections,
-            command_timeout=self.config.db_query_timeout,
-            server_settings={
-                "application_name": f"neural_webhook_read_{self.config.worker_id}"
-            },
-        )
-        logger.info(f"Nuevo pool de lectura creado para {self.config.db_read_host}")
-
-    async def _execute_save_event(self, event_data: dict) -> Optional[int]:
-        """Implementacion interna de save_event."""
-        async with self.write_pool.acquire() as conn:
-            result = await conn.fetchval(
-                """
-                INSERT INTO detected_plates_wh_devices (
-                    plate, image_url, camera_brand, camera_id, camera_location,
-                    violation_type, vehicle_type, direction, confidence,
-                    capture_time, created_at, raw_data, ocr_correction_report
-                ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12::jsonb, $13)
-                RETURNING id
-            """,
-                event_data.get("plate"),
-                event_data.get("image_url"),
-                event_data.get("camera_brand", "neural"),
-                event_data.get("camera_id"),
-                event_data.get("camera_location"),
-                event_data.get("violation_type"),
-                event_data.get("vehicle_type"),
-                event_data.get("direction"),
-                event_data.get("confidence"),
-                event_data.get("capture_time"),
-                datetime.now(timezone.utc),
-                event_data.get("raw_data"),
-                event_data.get("ocr_correction_report"),
+        # Los writers retienen una conexion del pool anterior: escriben lo ya
+        # encolado, se detienen y se reinician sobre el pool nuevo
+        await self._stop_writers()
+        old_pools = [pool for pool in (self.write_pool, self.read_pool) if pool]
+        self.write_pool, self.read_pool = new_write, new_read
+        self._start_writers()
+
+        if old_pools:
+            task = asyncio.create_task(
+                self._drain_and_close(old_pools, self.config.db_pool_drain_sec)
             )
+            self._drain_tasks.add(task)
+            task.add_done_callback(self._drain_tasks.discard)
 
-            if result:
-                self._total_events += 1
-                logger.info(
-                    f"Neural event saved to detected_plates_wh_devices - ID: {result}, plate: {event_data.get('plate')}"
-                )
+    async def _drain_and_close(self, pools: List[Pool], delay: float) -> None:
+        """Cierra pools reemplazados: espera `delay` para que terminen las
+        consultas en curso, luego close() (espera releases) y, si no alcanza
+        otro `delay`, terminate()."""
+        try:
+            await asyncio.sleep(delay)
+            await asyncio.wait_for(
+                asyncio.gather(*(pool.close() for pool in pools)), timeout=delay
+            )
+            logger.info("Pools anteriores cerrados")
+        except asyncio.TimeoutError:
+            logger.warning(
+                "Pools anteriores sin drenar a tiempo, terminando conexiones"
+            )
+            for pool in pools:
+                pool.terminate()
+        except asyncio.CancelledError:
+            for pool in pools:
+                pool.terminate()
+            raise
+
+    @staticmethod
+    def _on_event_saved(event_id: Optional[int], event: EventRow) -> None:
+        if event_id:
+            logger.info(
+                f"Neural event saved to detected_plates_wh_devices - ID: {event_id}, plate: {event.plate}"
+            )
 
+    @staticmethod
+    def _on_rejected_saved(rejected_id: Optional[int], rejection: RejectedRow) -> None:
+        if rejected_id:
+            logger.info(
+                f"Rejected plate saved - Brand: {rejection.camera_brand}, ID: {rejected_id}"
+            )
+
+    async def _execute_write(
+        self, kind: str, data: Union[EventRow, RejectedRow]
+    ) -> Optional[int]:
+        """Insert de una sola fila con su propio checkout del pool (sin writers)."""
+        sql, to_record, on_saved = self._write_ops[kind]
+        async with self._write_conn() as conn:
+            result = await conn.fetchval(sql, *to_record(data))
+            on_saved(result, data)
+            if result and kind == "event":
+                self._total_events += 1
             return result
 
-    async def save_event(self, event_data: dict) -> Optional[int]:
+    async def _execute_save_event(self, event: EventRow) -> Optional[int]:
+        """Implementacion interna de save_event (una fila, sin writers)."""
+        return await self._execute_write("event", event)
+
+    async def _execute_save_rejected(self, rejection: RejectedRow) -> Optional[int]:
+        """Implementacion interna de save_rejected_plate_wh (una fila, sin writers)."""
+        return await self._execute_write("rejected", rejection)
+
+    async def _execute_write_batch(
+        self, conn, batch: List[tuple]
+    ) -> List[Optional[int]]:
+        """
+        Ejecuta los inserts del lote en la conexion del writer, dentro de la
+        transaccion que abre el llamador (un commit para todo el lote).
+        """
+        ids = []
+        for kind, data, _ in batch:
+            sql, to_record, _ = self._write_ops[kind]
+            ids.append(await conn.fetchval(sql, *to_record(data)))
+        return ids
+
+    def _resolve_write_batch(
+        self, batch: List[tuple], ids: List[Optional[int]]
+    ) -> None:
+        """Resuelve el future de cada item de un lote ya confirmado con su id."""
+        saved_events = 0
+        for (kind, data, future), row_id in zip(batch, ids):
+            self._write_ops[kind][2](row_id, data)
+            if row_id and kind == "event":
+                saved_events += 1
+            if not future.done():
+                future.set_result(row_id)
+        # Un solo incremento del contador por lote
+        self._total_events += saved_events
+
+    async def _execute_writes_individually(self, batch: List[tuple]) -> None:
+        """Reintenta un lote fallido fila por fila para aislar la fila culpable."""
+        for kind, data, future in batch:
+            try:
+                row_id = await self._execute_write(kind, data)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(row_id)
+
+    async def _collect_batch(self, queue: asyncio.Queue, batch: list) -> bool:
+        """
+        Agrega a `batch` el primer item de la cola y los que lleguen durante
+        db_batch_max_wait_ms (hasta db_batch_max_size). La lista es del
+        llamador: si se cancela a mitad, lo ya desencolado no se pierde.
+        Devuelve True si tomo _STOP (el lote se cierra ahi).
+        """
+        max_size = self.config.db_batch_max_size
+        max_wait = self.config.db_batch_max_wait_ms / 1000.0
+        loop = asyncio.get_running_loop()
+
+        item = await queue.get()
+        if item is _STOP:
+            return True
+        batch.append(item)
+        deadline = loop.time() + max_wait
+        while len(batch) < max_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            if item is _STOP:
+                return True
+            batch.append(item)
+        return False
+
+    async def _writer_loop(self) -> None:
+        """
+        Writer de larga vida: mantiene una conexion del pool de escritura fuera
+        del pool (sin acquire/release por insert) y le envia los lotes de la
+        cola. Si la conexion falla o el pool se recrea, la devuelve y toma otra.
+        Termina al tomar _STOP, tras escribir el lote en curso.
+        """
+        pool = conn = None
+        batch: List[tuple] = []
+        committing = False
+        stop = False
+        try:
+            while not stop:
+                batch = []
+                committing = False
+                stop = await self._collect_batch(self._write_queue, batch)
+                if not batch:
+                    continue
+                try:
+                    if conn is None or pool is not self.write_pool or conn.is_closed():
+                        if conn is not None:
+                            await pool.release(conn)
+                        pool, conn = self.write_pool, None
+                        conn = await pool.acquire()
+                    async with conn.transaction():
+                        ids = await self._execute_write_batch(conn, batch)
+                        # Desde aqui el COMMIT puede llegar al servidor
+                        committing = True
+                    self._resolve_write_batch(batch, ids)
+                except Exception as e:
+                    if conn is not None:
+                        await pool.release(conn)
+                        conn = None
+                    if committing:
+                        # Fallo en el COMMIT: el lote pudo quedar escrito, no se reintenta
+                        for _, _, future in batch:
+                            if not future.done():
+                                future.set_exception(e)
+                    elif len(batch) > 1 and not self.is_auth_error(e):
+                        logger.warning(
+                            f"Lote de {len(batch)} inserts fallido ({e}), reintentando fila por fila"
+                        )
+                        await self._execute_writes_individually(batch)
+                    else:
+                        for _, _, future in batch:
+                            if not future.done():
+                                future.set_exception(e)
+        finally:
+            # Cancelado a mitad de lote (incluida la recoleccion): lo no enviado
+            # vuelve a la cola. Con el COMMIT ya enviado no se reencola (duplicaria
+            # filas ya escritas): el resultado es incierto y se informa como error.
+            for item in batch:
+                future = item[2]
+                if future.done():
+                    continue
+                if committing:
+                    future.set_exception(
+                        RuntimeError("Writer cancelado durante el COMMIT del lote")
+                    )
+                else:
+                    self._write_queue.put_nowait(item)
+            if conn is not None:
+                await pool.release(conn)
+
+    def _start_writers(self) -> None:
+        if self._write_queue is None:
+            self._write_queue = asyncio.Queue()
+        if not self._writer_tasks:
+            self._writer_tasks = [
+                asyncio.create_task(self._writer_loop())
+                for _ in range(self.config.db_writer_workers)
+            ]
+
+    async def _stop_writers(self) -> None:
+        """
+        Detiene los writers entre lotes: cada uno toma un _STOP encolado detras
+        de los inserts pendientes, escribe su ultimo lote y devuelve su conexion.
+        Lo que se encole mientras tanto queda en la cola para los siguientes.
+        """
+        if not self._writer_tasks:
+            return
+        for _ in self._writer_tasks:
+            self._write_queue.put_nowait(_STOP)
+        await asyncio.gather(*self._writer_tasks, return_exceptions=True)
+        self._writer_tasks = []
+
+        # Un writer caido no consume su _STOP: se descarta para que no detenga
+        # a los writers siguientes
+        pending = []
+        while not self._write_queue.empty():
+            item = self._write_queue.get_nowait()
+            if item is not _STOP:
+                pending.append(item)
+        for item in pending:
+            self._write_queue.put_nowait(item)
+
+    def _fail_pending_writes(self) -> None:
+        while self._write_queue is not None and not self._write_queue.empty():
+            _, _, future = self._write_queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Database service cerrado"))
+
+    async def _enqueue_write(
+        self, kind: str, data: Union[EventRow, RejectedRow]
+    ) -> Optional[int]:
+        """Encola el insert para los writers y espera su id."""
+        if not self._writer_tasks:
+            return await self._execute_write(kind, data)
+
+        future = asyncio.get_running_loop().create_future()
+        await self._write_queue.put((kind, data, future))
+        return await future
+
+    async def save_event(self, event: EventRow) -> Optional[int]:
         """Save a Neural event to the unified detected_plates_wh_devices table"""
         try:
-            return await self._execute_save_event(event_data)
+            return await self._enqueue_write("event", event)
         except Exception as e:
             if self.is_auth_error(e) and self.on_auth_error:
                 logger.warning(
@@ -256,7 +794,7 @@ class NeuralDatabaseService:
                 refreshed = await self.on_auth_error(e)
                 if refreshed:
                     try:
-                        return await self._execute_save_event(event_data)
+                        return await self._execute_save_event(event)
                     except Exception as retry_e:
                         logger.error(
                             f"Error guardando evento tras refresh de credenciales: {retry_e}"
@@ -265,38 +803,101 @@ class NeuralDatabaseService:
             logger.error(f"Error saving Neural event to database: {e}")
             return None
 
-    async def _execute_save_rejected(self, rejection_data: dict) -> Optional[int]:
-        """Implementacion interna de save_rejected_plate_wh."""
-        async with self.write_pool.acquire() as conn:
-            result = await conn.fetchval(
-                """
-                INSERT INTO rejected_plates_wh_cameras (
-                    camera_brand, camera_id, raw_plate_text, confidence,
-                    rejection_reason, rejection_type, country, vehicle_type, raw_data
-                ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
-                RETURNING id
-            """,
-                rejection_data.get("camera_brand", "neural"),
-                rejection_data.get("camera_id"),
-                rejection_data.get("raw_plate_text"),
-                rejection_data.get("confidence"),
-                rejection_data.get("rejection_reason"),
-                rejection_data.get("rejection_type"),
-                rejection_data.get("country"),
-                rejection_data.get("vehicle_type"),
-                rejection_data.get("raw_data"),
-            )
+    async def save_events_batch(self, events: List[EventRow]) -> int:
+        """
+        Inserta un lote de eventos sin devolver ids. Lotes grandes usan COPY
+        binario (sin Bind/Execute por fila); lotes pequenos, executemany sobre
+        el INSERT preparado.
+        """
+        if not events:
+            return 0
 
-            if result:
-                logger.info(
-                    f"Rejected plate saved - Brand: {rejection_data.get('camera_brand')}, ID: {result}"
+        records = [event.as_record() for event in events]
+        async with self._write_conn() as conn:
+            if len(records) >= _COPY_MIN_ROWS:
+                await conn.copy_records_to_table(
+                    "detected_plates_wh_devices",
+                    records=records,
+                    columns=_EVENT_COLUMNS,
                 )
-            return result
+            else:
+                await conn.executemany(_INSERT_EVENT_SQL, records)
+
+        self._total_events += len(records)
+        logger.info(f"Lote de {len(records)} eventos Neural guardado")
+        return len(records)
+
+    async def _ingest_batch(self, batch: List[EventRow]) -> None:
+        """Persiste un lote de la cola de ingesta; si falla, cae a save_event
+        por fila (con su refresh de credenciales) para no perder eventos."""
+        try:
+            await self.save_events_batch(batch)
+        except Exception as e:
+            logger.warning(
+                f"Lote de ingesta de {len(batch)} eventos fallido ({e}), guardando uno por uno"
+            )
+            for event in batch:
+                await self.save_event(event)
+
+    async def _ingest_loop(self) -> None:
+        """Persiste la cola de ingesta por lotes; termina al tomar _STOP, tras
+        guardar el lote en curso."""
+        stop = False
+        while not stop:
+            batch: List[EventRow] = []
+            stop = await self._collect_batch(self._ingest_queue, batch)
+            if batch:
+                await self._ingest_batch(batch)
+
+    async def _stop_ingest(self) -> None:
+        """
+        Detiene el consumidor de ingesta sin cancelarlo (un cancel perderia su
+        lote en curso): guarda lo encolado antes de _STOP y termina. Lo que se
+        encole mientras tanto se persiste aqui.
+        """
+        if self._ingest_task is None:
+            return
+
+        if not self._ingest_task.done():
+            await self._ingest_queue.put(_STOP)
+        await asyncio.gather(self._ingest_task, return_exceptions=True)
+        self._ingest_task = None
+
+        pending = []
+        while not self._ingest_queue.empty():
+            event = self._ingest_queue.get_nowait()
+            if event is not _STOP:
+                pending.append(event)
+        if pending:
+            await self._ingest_batch(pending)
+
+    async def save_event_async(self, event: EventRow) -> None:
+        """
+        Encola el evento para persistirlo en segundo plano (sin id de fila) y
+        retorna sin esperar el commit. Con la cola llena (max_inflight_events)
+        guarda de forma sincronica: nunca descarta eventos.
+        """
+        if self._ingest_task is None:
+            await self.save_event(event)
+            return
+
+        try:
+            self._ingest_queue.put_nowait(event)
+        except asyncio.QueueFull:
+            logger.warning(
+                "Cola de ingesta llena, guardando evento de forma sincronica"
+            )
+            await self.save_event(event)
+
+    @property
+    def ingest_queue_depth(self) -> int:
+        """Eventos encolados por save_event_async aun no persistidos"""
+        return self._ingest_queue.qsize() if self._ingest_queue is not None else 0
 
-    async def save_rejected_plate_wh(self, rejection_data: dict) -> Optional[int]:
+    async def save_rejected_plate_wh(self, rejection: RejectedRow) -> Optional[int]:
         """Guarda placa rechazada en tabla compartida de webhooks"""
         try:
-            return await self._execute_save_rejected(rejection_data)
+            return await self._enqueue_write("rejected", rejection)
         except Exception as e:
             if self.is_auth_error(e) and self.on_auth_error:
                 logger.warning(
@@ -305,7 +906,7 @@ class NeuralDatabaseService:
                 refreshed = await self.on_auth_error(e)
                 if refreshed:
                     try:
-                        return await self._execute_save_rejected(rejection_data)
+                        return await self._execute_save_rejected(rejection)
                     except Exception as retry_e:
                         logger.error(
                             f"Error guardando rechazo tras refresh de credenciales: {retry_e}"
@@ -317,68 +918,57 @@ class NeuralDatabaseService:
     async def get_recent_events(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Get recent Neural events from database"""
         try:
-            async with self.read_pool.acquire() as conn:
-                rows = await conn.fetch(
-                    """
-                    SELECT id, plate, image_url, camera_brand, camera_id,
-                           camera_location, violation_type, vehicle_type,
-                           direction, confidence, capture_time, created_at, raw_data
-                    FROM detected_plates_wh_devices
-                    WHERE camera_brand = 'neural'
-                    ORDER BY created_at DESC
-                    LIMIT $1
-                """,
-                    limit,
-                )
-
-                events = []
-                for row in rows:
-                    events.append(
-                        {
-                            "id": row["id"],
-                            "plate": row["plate"],
-                            "confidence": float(row["confidence"])
-                            if row["confidence"]
-                            else None,
-                            "capture_time": row["capture_time"],
-                            "camera_id": row["camera_id"],
-                            "camera_brand": row["camera_brand"],
-                            "camera_location": row["camera_location"],
-                            "image_url": row["image_url"],
-                            "vehicle_type": row["vehicle_type"],
-                            "direction": row["direction"],
-                            "violation_type": row["violation_type"],
-                            "created_at": row["created_at"],
-                            "raw_data": row["raw_data"],
-                        }
-                    )
+            async with self._read_conn() as conn:
+                rows = await conn.fetch(_RECENT_EVENTS_SQL, limit)
 
-                return events
+                # map(dict, ...) convierte cada Record en C (sin bytecode por fila);
+                # confidence llega como float (codec numeric) o None si es 0
+                return list(map(dict, rows))
 
         except Exception as e:
             logger.error(f"Error getting recent Neural events: {e}")
             return []
 
+    async def refresh_event_rollup(self) -> None:
+        """
+        Actualiza neural_event_hourly y neural_plates_seen con los eventos
+        desde el ultimo refresco (al menos las dos ultimas horas); no hace
+        nada si otro worker ya refresco en este intervalo.
+        """
+        interval = self.config.stats_rollup_refresh_sec
+        async with self._write_conn() as conn:
+            await conn.execute(_REFRESH_EVENT_ROLLUP_SQL, interval, timeout=interval)
+
+    async def _event_rollup_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.config.stats_rollup_refresh_sec)
+            try:
+                await self.refresh_event_rollup()
+            except Exception as e:
+                logger.warning(f"Error refrescando agregados de estadisticas: {e}")
+
+    async def _read_fetchrow(self, sql: str):
+        """fetchrow en su propia conexion de lectura"""
+        async with self._read_conn() as conn:
+            return await conn.fetchrow(sql)
+
     async def get_event_stats(self) -> Dict[str, Any]:
         """Get Neural event statistics"""
         try:
-            async with self.read_pool.acquire() as conn:
-                row = await conn.fetchrow("""
-                    SELECT
-                        COUNT(*) as total_events,
-                        COUNT(CASE WHEN DATE(created_at) = CURRENT_DATE THEN 1 END) as events_today,
-                        COUNT(DISTINCT plate) FILTER (WHERE plate IS NOT NULL AND plate != '') as unique_plates,
-                        COUNT(CASE WHEN created_at >= NOW() - INTERVAL '1 hour' THEN 1 END) as events_last_hour
-                    FROM detected_plates_wh_devices
-                    WHERE camera_brand = 'neural'
-                """)
-
-                return {
-                    "total_events": row["total_events"] if row else 0,
-                    "events_today": row["events_today"] if row else 0,
-                    "unique_plates": row["unique_plates"] if row else 0,
-                    "events_last_hour": row["events_last_hour"] if row else 0,
-                }
+            # Totales y placas unicas salen de los agregados (atrasados a lo
+            # sumo stats_rollup_refresh_sec), events_last_hour de la tabla; en
+            # paralelo, cada uno en su conexion
+            counts, plates = await asyncio.gather(
+                self._read_fetchrow(_EVENT_COUNTS_SQL),
+                self._read_fetchrow(_UNIQUE_PLATES_SQL),
+            )
+
+            return {
+                "total_events": counts["total_events"] if counts else 0,
+                "events_today": counts["events_today"] if counts else 0,
+                "unique_plates": plates["unique_plates"] if plates else 0,
+                "events_last_hour": counts["events_last_hour"] if counts else 0,
+            }
 
         except Exception as e:
             logger.error(f"Error getting Neural event statistics: {e}")
@@ -394,44 +984,11 @@ class NeuralDatabaseService:
     ) -> List[Dict[str, Any]]:
         """Get Neural events by plate number"""
         try:
-            async with self.read_pool.acquire() as conn:
-                rows = await conn.fetch(
-                    """
-                    SELECT id, plate, image_url, camera_brand, camera_id,
-                           camera_location, violation_type, vehicle_type,
-                           direction, confidence, capture_time, created_at, raw_data
-                    FROM detected_plates_wh_devices
-                    WHERE plate = $1 AND camera_brand = 'neural'
-                    ORDER BY created_at DESC
-                    LIMIT $2
-                """,
-                    plate,
-                    limit,
-                )
-
-                events = []
-                for row in rows:
-                    events.append(
-                        {
-                            "id": row["id"],
-                            "plate": row["plate"],
-                            "confidence": float(row["confidence"])
-                            if row["confidence"]
-                            else None,
-                            "capture_time": row["capture_time"],
-                            "camera_id": row["camera_id"],
-                            "camera_brand": row["camera_brand"],
-                            "camera_location": row["camera_location"],
-                            "image_url": row["image_url"],
-                            "vehicle_type": row["vehicle_type"],
-                            "direction": row["direction"],
-                            "violation_type": row["violation_type"],
-                            "created_at": row["created_at"],
-                            "raw_data": row["raw_data"],
-                        }
-                    )
-
-                return events
+            async with self._read_conn() as conn:
+                rows = await conn.fetch(_EVENTS_BY_PLATE_SQL, plate, limit)
+            # map(dict, ...) convierte cada Record en C (sin bytecode por fila);
+            # confidence llega como float (codec numeric) o None si es 0
+            return list(map(dict, rows))
 
         except Exception as e:
             logger.error(f"Error getting events by plate {plate}: {e}")
@@ -445,6 +1002,19 @@ class NeuralDatabaseService:
     async def close(self):
         """Close database connection pools"""
         try:
+            await self._stop_ingest()
+            await self._stop_writers()
+            self._fail_pending_writes()
+
+            if self._rollup_task:
+                self._rollup_task.cancel()
+                await asyncio.gather(self._rollup_task, return_exceptions=True)
+                self._rollup_task = None
+
+            for task in list(self._drain_tasks):
+                task.cancel()
+            await asyncio.gather(*self._drain_tasks, return_exceptions=True)
+
             if self.write_pool:
                 await self.write_pool.close()
                 logger.info("Write connection pool closed")
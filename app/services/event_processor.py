@@ -1,24 +1,138 @@
-import base64
-import json
+import asyncio
 import logging
 from datetime import datetime, timezone
-from typing import Any, Dict, Optional, Tuple
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple, Union
 
+import msgspec
+from msgspec import UNSET
 from fastapi import Request
 
-from services.storage_service import NeuralStorageService
+try:
+    # Decodificador SIMD (libbase64); las wheels de Linux x86_64/aarch64 lo traen compilado
+    from pybase64 import b64decode
+except ImportError:
+    from base64 import b64decode
+
+from models.events import EventRow, RejectedRow
+from models.responses import (
+    CreatedEvent,
+    RejectedEvent,
+    WebhookErrorResponse,
+    WebhookResponse,
+)
+from services.storage_service import NeuralStorageService, new_request_id
 from utils.plate_normalizer import normalize_neural_plate
 
 logger = logging.getLogger(__name__)
 
 
+class _Evidence(msgspec.Struct):
+    # Raw vacio (falsy) cuando el campo no viene
+    imgEV: msgspec.Raw = msgspec.field(default_factory=msgspec.Raw)
+
+
+class _EvidenceItem(msgspec.Struct):
+    Evidence: _Evidence = msgspec.field(default_factory=_Evidence)
+
+
+class _WebhookPayload(msgspec.Struct):
+    # Cada campo de infoplate queda como Raw (slice del body sin parsear): solo
+    # se decodifica lo que se usa, y las imagenes van directo de JSON a bytes
+    infoplate: Dict[str, msgspec.Raw] = {}
+
+
+_PAYLOAD_DECODER = msgspec.json.Decoder(_WebhookPayload)
+# Evidences se decodifica item por item: uno invalido no descarta el resto
+_EVIDENCES_DECODER = msgspec.json.Decoder(List[msgspec.Raw])
+_EVIDENCE_ITEM_DECODER = msgspec.json.Decoder(_EvidenceItem)
+_IMAGE_DECODER = msgspec.json.Decoder(bytes)
+_OPTIONAL_STR_DECODER = msgspec.json.Decoder(Optional[str])
+_ANY_DECODER = msgspec.json.Decoder()
+# Los Raw se copian tal cual: raw_data sale del body sin parsear ni re-serializar
+_RAW_ENCODER = msgspec.json.Encoder()
+
+
+def _field(fields: Dict[str, msgspec.Raw], key: str, default: Any) -> Any:
+    """Decodifica un solo campo de infoplate (default si no viene)"""
+    raw = fields.get(key)
+    return default if raw is None else _ANY_DECODER.decode(raw)
+
+
+async def _read_body(request: Request) -> bytes:
+    """
+    Lee el body por request.stream(). request.body() lo cachea en
+    request._body y el request vive todo el handler; asi la unica referencia
+    es la del llamador y el body se libera al soltarla.
+    """
+    return b"".join([chunk async for chunk in request.stream()])
+
+
+_BANNER = "=" * 50
+
+# Limpieza de placa para el reporte OCR: a-z -> A-Z, se eliminan " " y "-"
+_PLATE_CLEAN_TABLE = str.maketrans(
+    "abcdefghijklmnopqrstuvwxyz", "ABCDEFGHIJKLMNOPQRSTUVWXYZ", " -"
+)
+
+# Formatos no ISO aceptados de Neural (ruta lenta, solo si el parser fijo no aplica)
+_FALLBACK_TIMESTAMP_FORMATS = ("%Y-%m-%d %H:%M:%S", "%d/%m/%Y %H:%M:%S", "%Y%m%d%H%M%S")
+
+
+@lru_cache(maxsize=1024)
+def _parse_timestamp(timestamp_str: str) -> Optional[datetime]:
+    """
+    Parsea un timestamp de Neural. Una camara repite el mismo formato (y en
+    rafagas el mismo segundo), por eso se cachea por string.
+    """
+    try:
+        # Intentar formato ISO (fromisoformat esta en C y acepta 'Z' desde 3.11)
+        return datetime.fromisoformat(timestamp_str.replace("Z", "+00:00"))
+    except ValueError:
+        pass
+
+    # Formatos de ancho fijo: se construye el datetime directo, sin strptime
+    s = timestamp_str
+    try:
+        if len(s) == 19 and s[2] == "/" and s[5] == "/":  # dd/mm/YYYY HH:MM:SS
+            return datetime(
+                int(s[6:10]),
+                int(s[3:5]),
+                int(s[0:2]),
+                int(s[11:13]),
+                int(s[14:16]),
+                int(s[17:19]),
+                tzinfo=timezone.utc,
+            )
+        if len(s) == 14 and s.isdigit():  # YYYYmmddHHMMSS
+            return datetime(
+                int(s[0:4]),
+                int(s[4:6]),
+                int(s[6:8]),
+                int(s[8:10]),
+                int(s[10:12]),
+                int(s[12:14]),
+                tzinfo=timezone.utc,
+            )
+    except ValueError:
+        pass
+
+    for fmt in _FALLBACK_TIMESTAMP_FORMATS:
+        try:
+            return datetime.strptime(timestamp_str, fmt).replace(tzinfo=timezone.utc)
+        except ValueError:
+            continue
+    return None
+
+
 class NeuralEventProcessor:
     """Procesador de eventos para camaras Neural"""
 
-    def __init__(self, config, db_service):
+    def __init__(self, config, db_service, storage_service: NeuralStorageService):
         self.config = config
         self.db_service = db_service
-        self.storage_service = NeuralStorageService(config)
+        # Compartido entre procesadores (lo crea y cierra NeuralWebhookService)
+        self.storage_service = storage_service
         self._total_events = 0
         self._last_event_time: Optional[datetime] = None
 
@@ -30,24 +144,38 @@ class NeuralEventProcessor:
     def last_event_time(self) -> Optional[datetime]:
         return self._last_event_time
 
-    async def process_webhook_event(self, request: Request) -> Tuple[Optional[int], Dict[str, Any]]:
+    async def process_webhook_event(
+        self, request: Request
+    ) -> Tuple[Optional[int], Union[WebhookResponse, WebhookErrorResponse]]:
         try:
             logger.info("EVENTO NEURAL")
-            logger.info("=" * 50)
-
-            # Leer body JSON
-            body_bytes = await request.body()
-            data = json.loads(body_bytes.decode("utf-8"))
-
-            # Extraer datos de infoplate
-            infoplate = data.get("infoplate", {})
-
-            plate = infoplate.get("Plate", "")
-            timestamp = infoplate.get("DateHour", datetime.now(timezone.utc).isoformat())
-            confidence_str = infoplate.get("confidence", "0")
-            camera_name = infoplate.get("CamName", "")
-            image_b64 = infoplate.get("img", "")
-            evidences = infoplate.get("Evidences", [])
+            logger.info(_BANNER)
+
+            # Un solo reloj por request: nombres de archivo, carpeta de fecha y respuesta
+            now = datetime.now(timezone.utc)
+            ts_str = now.strftime("%H%M%S_%f")
+
+            # Leer body JSON con extraccion dirigida: img y Evidences no se
+            # materializan como str; del resto solo se decodifican los campos usados
+            body_bytes = await _read_body(request)
+            fields = _PAYLOAD_DECODER.decode(body_bytes).infoplate
+            # El request no cachea el body (_read_body): desde aqui solo lo
+            # mantienen vivo los Raw de fields, img y Evidences
+            del body_bytes
+
+            image_raw = fields.pop("img", None)
+            evidences = self._decode_evidences(fields.pop("Evidences", None))
+
+            # raw_data: infoplate sin imagenes, serializado una sola vez para
+            # ambas ramas (bytes JSON; el codec jsonb los envia tal cual)
+            raw_data_json = _RAW_ENCODER.encode(fields)
+
+            plate = _field(fields, "Plate", "")
+            timestamp = _field(fields, "DateHour", now.isoformat())
+            confidence_str = _field(fields, "confidence", "0")
+            camera_name = _field(fields, "CamName", "")
+            # Cada Raw referencia el body completo: soltar los que ya no se usan
+            del fields
 
             # Normalizar confianza
             try:
@@ -58,21 +186,26 @@ class NeuralEventProcessor:
             if plate == "UNKNOWN" or not plate:
                 plate = None
 
-            logger.info(f"  Placa: {plate if plate else 'No detectada'}")
-            logger.info(f"  Confianza: {confidence}%")
-            logger.info(f"  Timestamp: {timestamp}")
-            logger.info(f"  Camara: {camera_name}")
-            logger.info(f"  Imagen principal: {'Si' if image_b64 else 'No'}")
-            logger.info(f"  Evidencias: {len(evidences)}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("  Placa: %s", plate if plate else "No detectada")
+                logger.debug("  Confianza: %s%%", confidence)
+                logger.debug("  Timestamp: %s", timestamp)
+                logger.debug("  Camara: %s", camera_name)
+                logger.debug(
+                    "  Imagen principal: %s", "Si" if image_raw is not None else "No"
+                )
+                logger.debug("  Evidencias: %d", len(evidences))
 
             # Variables para respuesta
-            created_events = []
-            rejected_events = []
+            created_events: List[CreatedEvent] = []
+            rejected_events: List[RejectedEvent] = []
 
             # NORMALIZACION de placa
             confidence_for_normalize = confidence
 
-            logger.info(f"Normalizando: plate={plate}, conf={confidence_for_normalize}")
+            logger.info(
+                "Normalizando: plate=%s, conf=%s", plate, confidence_for_normalize
+            )
 
             result = normalize_neural_plate(
                 plate_text=plate,
@@ -83,85 +216,96 @@ class NeuralEventProcessor:
             )
 
             logger.info(
-                f"Resultado: valid={result.is_valid}, colombian={result.is_colombian}, "
-                f"normalized={result.normalized_plate}, ocr={result.ocr_corrections_applied}"
+                "Resultado: valid=%s, colombian=%s, normalized=%s, ocr=%d",
+                result.is_valid,
+                result.is_colombian,
+                result.normalized_plate,
+                result.ocr_corrections_applied,
             )
 
             # RECHAZADA
             if not result.is_valid:
-                logger.warning(f"RECHAZADA: {result.rejection_reason}")
+                logger.warning("RECHAZADA: %s", result.rejection_reason)
 
                 if not self.config.strict_mode:
                     try:
                         rejection_id = await self.db_service.save_rejected_plate_wh(
-                            {
-                                "camera_brand": "neural",
-                                "camera_id": camera_name,
-                                "raw_plate_text": plate,
-                                "confidence": result.confidence_normalized,
-                                "rejection_reason": result.rejection_reason,
-                                "rejection_type": self._classify_rejection_type(result),
-                                "country": None,
-                                "vehicle_type": None,
-                                "raw_data": json.dumps(
-                                    {k: v for k, v in infoplate.items() if k not in ("img", "Evidences")},
-                                    ensure_ascii=False,
-                                ),
-                            }
+                            RejectedRow(
+                                camera_brand="neural",
+                                camera_id=camera_name,
+                                raw_plate_text=plate,
+                                confidence=result.confidence_normalized,
+                                rejection_reason=result.rejection_reason,
+                                rejection_type=self._classify_rejection_type(result),
+                                # columna TEXT: JSON UTF-8 sin escapes (como ensure_ascii=False)
+                                raw_data=raw_data_json.decode(),
+                            )
                         )
-                        logger.info(f"Rechazo guardado ID: {rejection_id}")
+                        logger.info("Rechazo guardado ID: %s", rejection_id)
                     except Exception as e:
                         logger.error(f"Error guardando rechazo: {e}")
 
                 rejected_events.append(
-                    {
-                        "raw_plate": plate,
-                        "confidence": result.confidence_normalized,
-                        "rejection_reason": result.rejection_reason,
-                    }
+                    RejectedEvent(
+                        raw_plate=plate,
+                        confidence=result.confidence_normalized,
+                        rejection_reason=result.rejection_reason,
+                    )
                 )
 
             # VALIDA - Guardar imagenes y evento
             else:
                 logger.info("VALIDA - Guardando...")
 
-                saved_images = []
-
-                # Guardar imagen principal
-                if image_b64:
+                # Decodificar imagen principal y evidencias fuera del event loop
+                # (un solo salto al thread pool para todas las imagenes)
+                images = []
+                if image_raw is not None or evidences:
+                    # Los errores por imagen los aisla _decode_images; aqui solo
+                    # llega un fallo del salto al thread pool
                     try:
-                        img_bytes = self._decode_base64_image(image_b64)
-                        if img_bytes:
-                            filename = f"detection_{datetime.now(timezone.utc).strftime('%H%M%S_%f')}.jpg"
-                            relative_path, full_bucket_url = await self.storage_service.save_image(
-                                img_bytes,
-                                filename,
-                                plate_prefix=result.normalized_plate if result.normalized_plate else "unknown",
-                            )
-                            saved_images.append(full_bucket_url)
-                            logger.info(f"Imagen principal guardada: {relative_path}")
+                        images = await asyncio.to_thread(
+                            self._decode_images, image_raw, evidences, ts_str
+                        )
                     except Exception as e:
-                        logger.error(f"Error guardando imagen principal: {e}")
-
-                # Guardar evidencias
-                if evidences:
-                    for idx, evidence_item in enumerate(evidences, start=1):
-                        try:
-                            evidence_data = evidence_item.get("Evidence", {})
-                            evidence_b64 = evidence_data.get("imgEV", "")
-                            if evidence_b64:
-                                img_bytes = self._decode_base64_image(evidence_b64)
-                                if img_bytes:
-                                    filename = f"evidence_{idx}_{datetime.now(timezone.utc).strftime('%H%M%S_%f')}.jpg"
-                                    relative_path, full_bucket_url = await self.storage_service.save_image(
-                                        img_bytes,
-                                        filename,
-                                        plate_prefix=result.normalized_plate if result.normalized_plate else "unknown",
-                                    )
-                                    saved_images.append(full_bucket_url)
-                                    logger.info(f"Evidencia {idx} guardada: {relative_path}")
-                        except Exception as e:
-                            logger.error(f"Error guardando evidencia {idx}: {e}")
+                        logger.error(f"Error decodificando imagenes: {e}")
+                # Sin Raw vivos el body (con todo el base64) se libera antes de las
+                # subidas: en memoria queda una sola copia de cada imagen (los bytes
+                # decodificados, que aiohttp escribe al socket sin copiar). No se
+                # decodifica en streaming hacia el PUT: eso mantendria vivo el body
+                # (4/3 del tamano de las imagenes) durante todas las subidas y los
+                # reintentos tendrian que volver a decodificar
+                image_raw = evidences = None
+
+                # Subir todas las imagenes en paralelo (tiempo total ~ la subida mas lenta)
+                plate_prefix = (
+                    result.normalized_plate if result.normalized_plate else "unknown"
+                )
+                request_id = new_request_id()
+                upload_results = await asyncio.gather(
+                    *(
+                        self.storage_service.save_image(
+                            img_bytes,
+                            filename,
+                            plate_prefix=plate_prefix,
+                            now=now,
+                            request_id=request_id,
+                        )
+                        for _, img_bytes, filename in images
+                    ),
+                    return_exceptions=True,
+                )
+                labels = [label for label, _, _ in images]
+                del images
+
+                saved_images = []
+                for label, upload in zip(labels, upload_results):
+                    if isinstance(upload, BaseException):
+                        logger.error("Error guardando %s: %s", label.lower(), upload)
+                        continue
+                    relative_path, full_bucket_url = upload
+                    saved_images.append(full_bucket_url)
+                    logger.info("%s guardada: %s", label, relative_path)
 
                 # Guardar evento en BD
                 capture_time = self._parse_neural_timestamp(timestamp)
@@ -172,74 +316,148 @@ class NeuralEventProcessor:
                 # Usar la primera imagen como URL principal
                 primary_image_url = saved_images[0] if saved_images else None
 
-                event_record = {
-                    "plate": result.normalized_plate,
-                    "confidence": result.confidence_normalized,
-                    "capture_time": capture_time,
-                    "camera_id": camera_name,
-                    "camera_brand": "neural",
-                    "camera_location": None,
-                    "image_url": primary_image_url,
-                    "vehicle_type": result.vehicle_type,
-                    "direction": None,
-                    "violation_type": None,
-                    "raw_data": json.dumps(
-                        {k: v for k, v in infoplate.items() if k not in ("img", "Evidences")},
-                        ensure_ascii=False,
-                    ),
-                    "ocr_correction_report": ocr_report,
-                }
+                event_record = EventRow(
+                    plate=result.normalized_plate,
+                    image_url=primary_image_url,
+                    camera_brand="neural",
+                    camera_id=camera_name,
+                    vehicle_type=result.vehicle_type,
+                    confidence=result.confidence_normalized,
+                    capture_time=capture_time,
+                    # bytes JSON: el codec jsonb del pool de escritura los pasa tal cual
+                    raw_data=raw_data_json,
+                    ocr_correction_report=ocr_report,
+                )
 
-                event_id = await self.db_service.save_event(event_record)
+                if self.config.event_ingest_async:
+                    # Persistencia en segundo plano: la respuesta no espera el commit
+                    await self.db_service.save_event_async(event_record)
+                    event_id = None
+                else:
+                    event_id = await self.db_service.save_event(event_record)
 
                 created_events.append(
-                    {
-                        "event_id": event_id,
-                        "image_urls": saved_images,
-                        "normalized_plate": result.normalized_plate,
-                        "ocr_corrections": result.ocr_corrections_applied,
-                    }
+                    CreatedEvent(
+                        event_id=event_id,
+                        image_urls=saved_images,
+                        normalized_plate=result.normalized_plate,
+                        ocr_corrections=result.ocr_corrections_applied,
+                    )
                 )
 
-                logger.info(f"Evento ID: {event_id}, Placa: {result.normalized_plate}")
+                logger.info(
+                    "Evento ID: %s, Placa: %s", event_id, result.normalized_plate
+                )
 
-            logger.info(f"\nRESUMEN:")
-            logger.info(f"  - Creados: {len(created_events)}")
-            logger.info(f"  - Rechazados: {len(rejected_events)}")
+            logger.info(
+                "RESUMEN: creados=%d, rechazados=%d",
+                len(created_events),
+                len(rejected_events),
+            )
 
             self._total_events += len(created_events)
-            self._last_event_time = datetime.now(timezone.utc)
-
-            response_data = {
-                "status": "ok",
-                "events_created": len(created_events),
-                "events_rejected": len(rejected_events),
-                "plate": plate if plate else "No detectada",
-                "confidence": confidence_str,
-                "capture_time": timestamp,
-                "camera_name": camera_name,
-                "total_events": self._total_events,
-                "timestamp": self._last_event_time.isoformat(),
-            }
-
-            if created_events:
-                response_data["events"] = created_events
-            if rejected_events:
-                response_data["rejections"] = rejected_events
-
-            first_event_id = created_events[0]["event_id"] if created_events else None
+            self._last_event_time = now
+
+            response_data = WebhookResponse(
+                status="ok",
+                events_created=len(created_events),
+                events_rejected=len(rejected_events),
+                plate=plate if plate else "No detectada",
+                confidence=confidence_str,
+                capture_time=timestamp,
+                camera_name=camera_name,
+                total_events=self._total_events,
+                timestamp=self._last_event_time.isoformat(),
+                # Listas vacias quedan UNSET y no aparecen en el JSON
+                events=created_events or UNSET,
+                rejections=rejected_events or UNSET,
+            )
+
+            first_event_id = created_events[0].event_id if created_events else None
 
             logger.info("Completado")
-            logger.info("=" * 50)
+            logger.info(_BANNER)
             return first_event_id, response_data
 
         except Exception as e:
             logger.error(f"ERROR CRITICO: {e}", exc_info=True)
-            return None, {
-                "status": "error",
-                "error": str(e),
-                "timestamp": datetime.now(timezone.utc).isoformat(),
-            }
+            return None, WebhookErrorResponse(
+                status="error",
+                error=str(e),
+                timestamp=datetime.now(timezone.utc).isoformat(),
+            )
+
+    def _decode_images(
+        self,
+        image_raw: Optional[msgspec.Raw],
+        evidences: List[Optional[_EvidenceItem]],
+        ts_str: str,
+    ) -> List[Tuple[str, bytes, str]]:
+        """
+        Decodifica imagen principal y evidencias: lista de (etiqueta, bytes, nombre).
+        Las imagenes invalidas o vacias se omiten una por una: un error en una
+        imagen no descarta las demas.
+        """
+        sources = []
+        if image_raw is not None:
+            sources.append(("Imagen principal", image_raw, f"detection_{ts_str}.jpg"))
+        sources.extend(
+            (f"Evidencia {idx}", item.Evidence.imgEV, f"evidence_{idx}_{ts_str}.jpg")
+            for idx, item in enumerate(evidences, start=1)
+            if item is not None and item.Evidence.imgEV
+        )
+
+        decode = self._decode_image_field
+        images = []
+        for label, raw, filename in sources:
+            try:
+                img_bytes = decode(raw)
+            except Exception as e:
+                logger.error("Error decodificando %s: %s", label.lower(), e)
+                continue
+            if img_bytes:
+                images.append((label, img_bytes, filename))
+        return images
+
+    def _decode_evidences(
+        self, raw: Optional[msgspec.Raw]
+    ) -> List[Optional[_EvidenceItem]]:
+        """
+        Decodifica la lista Evidences item por item; las imagenes quedan como
+        Raw. Un item invalido queda como None (conserva la numeracion) y se
+        omite sin descartar las demas evidencias.
+        """
+        if raw is None:
+            return []
+        try:
+            items = _EVIDENCES_DECODER.decode(raw)
+        except msgspec.ValidationError as e:
+            logger.error(f"Evidences con formato invalido: {e}")
+            return []
+
+        evidences: List[Optional[_EvidenceItem]] = []
+        for idx, item in enumerate(items, start=1):
+            try:
+                evidences.append(_EVIDENCE_ITEM_DECODER.decode(item))
+            except msgspec.ValidationError as e:
+                logger.error("Evidencia %d con formato invalido: %s", idx, e)
+                evidences.append(None)
+        return evidences
+
+    def _decode_image_field(self, raw: msgspec.Raw) -> Optional[bytes]:
+        """
+        Decodifica un campo de imagen del JSON: base64 estandar va de JSON a
+        bytes en un solo paso; con prefijo data:...;base64, u otro formato no
+        estricto cae a la ruta de texto de _decode_base64_image.
+        """
+        try:
+            return _IMAGE_DECODER.decode(raw)
+        except msgspec.ValidationError:
+            try:
+                return self._decode_base64_image(_OPTIONAL_STR_DECODER.decode(raw))
+            except msgspec.ValidationError as e:
+                logger.error(f"Campo de imagen invalido: {e}")
+                return None
 
     def _decode_base64_image(self, b64_string: str) -> Optional[bytes]:
         """Decodifica una imagen base64, limpiando prefijos si existen."""
@@ -247,35 +465,21 @@ class NeuralEventProcessor:
             if not b64_string:
                 return None
 
-            # Limpiar prefijo data:image/...;base64,
-            if "," in b64_string:
-                b64_string = b64_string.split(",")[1]
+            # Limpiar prefijo data:image/...;base64, (sin construir la lista de split)
+            _, sep, payload = b64_string.partition(",")
+            if sep:
+                b64_string = payload
 
-            return base64.b64decode(b64_string)
+            return b64decode(b64_string, validate=False)
         except Exception as e:
             logger.error(f"Error decodificando base64: {e}")
             return None
 
     def _parse_neural_timestamp(self, timestamp_str: str) -> Optional[datetime]:
         """Parsea el timestamp de Neural."""
-        try:
-            if not timestamp_str:
-                return None
-            # Intentar formato ISO
-            return datetime.fromisoformat(timestamp_str.replace("Z", "+00:00"))
-        except Exception:
-            try:
-                # Intentar otros formatos comunes
-                for fmt in ["%Y-%m-%d %H:%M:%S", "%d/%m/%Y %H:%M:%S", "%Y%m%d%H%M%S"]:
-                    try:
-                        return datetime.strptime(timestamp_str, fmt).replace(
-                            tzinfo=timezone.utc
-                        )
-                    except ValueError:
-                        continue
-            except Exception:
-                pass
+        if not timestamp_str or not isinstance(timestamp_str, str):
             return None
+        return _parse_timestamp(timestamp_str)
 
     def _classify_rejection_type(self, result) -> str:
         """Clasifica el tipo de rechazo."""
@@ -297,19 +501,16 @@ class NeuralEventProcessor:
         if original_plate == normalized_plate:
             return "Sin correcciones aplicadas"
 
-        original_clean = original_plate.upper().strip().replace(" ", "").replace("-", "")
-        normalized_clean = (
-            normalized_plate.upper().strip().replace(" ", "").replace("-", "")
-        )
-
-        corrections_details = []
-        min_len = min(len(original_clean), len(normalized_clean))
+        # Mayusculas + quitar espacios y guiones en una sola pasada
+        original_clean = original_plate.translate(_PLATE_CLEAN_TABLE).strip()
+        normalized_clean = normalized_plate.translate(_PLATE_CLEAN_TABLE).strip()
 
-        for i in range(min_len):
-            if original_clean[i] != normalized_clean[i]:
-                corrections_details.append(
-                    f"pos{i}: {original_clean[i]}->{normalized_clean[i]}"
-                )
+        # zip corta en la longitud menor; sin indexar cada caracter dos veces
+        corrections_details = [
+            f"pos{i}: {orig}->{norm}"
+            for i, (orig, norm) in enumerate(zip(original_clean, normalized_clean))
+            if orig != norm
+        ]
 
         if corrections_details:
             details_str = ", ".join(corrections_details)
@@ -322,8 +523,8 @@ class NeuralEventProcessor:
         return {
             "processor": "healthy",
             "total_events": self._total_events,
-            "last_event_time": self._last_event_time.isoformat()
-            if self._last_event_time
-            else None,
+            "last_event_time": (
+                self._last_event_time.isoformat() if self._last_event_time else None
+            ),
             "storage": storage_health,
         }
@@ -1,16 +1,39 @@
 import os
 import asyncio
 import logging
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
 from typing import Optional, Tuple
-import aiofiles
+from urllib.parse import quote
+import aiohttp
 import oci
+import orjson
+import requests
+from yarl import URL
 from oci.object_storage import ObjectStorageClient
 from oci.exceptions import ServiceError
 
 logger = logging.getLogger(__name__)
 
+# Timeouts equivalentes a los del SDK de OCI (conexion 10s, lectura 60s)
+_HTTP_TIMEOUT = aiohttp.ClientTimeout(total=None, connect=10, sock_read=60)
+_HTTP_KEEPALIVE_SEC = 60
+_HTTP_MAX_ATTEMPTS = 3
+_HTTP_RETRY_BACKOFF_SEC = 0.5
+_HTTP_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+def new_request_id() -> str:
+    """
+    Sufijo de 12 hex (uuid4: un os.urandom por request) para los nombres de
+    objeto; a diferencia del timestamp en microsegundos no colisiona entre
+    requests concurrentes con la misma placa.
+    """
+    return uuid.uuid4().hex[:12]
+
 
 class NeuralStorageService:
     """
@@ -21,6 +44,15 @@ class NeuralStorageService:
     def __init__(self, config):
         self.config = config
         self.storage_type = config.storage_type
+        # Hilos propios para el SDK de OCI (bloqueante) sin agotar el executor
+        # por defecto que comparte asyncio.to_thread
+        self._io_executor: Optional[ThreadPoolExecutor] = None
+        # Sesion HTTP keep-alive para PUT/DELETE firmados (se crea en el loop)
+        self._session: Optional[aiohttp.ClientSession] = None
+        # Ultimo get_bucket exitoso (monotonic, bucket_info); los probes
+        # concurrentes esperan el lock en vez de repetir la llamada a OCI
+        self._bucket_info: Tuple[float, Optional[dict]] = (0.0, None)
+        self._health_lock = asyncio.Lock()
 
         if self.storage_type == "local":
             self._setup_local_storage()
@@ -29,8 +61,10 @@ class NeuralStorageService:
 
     def _setup_local_storage(self):
         """Configurar almacenamiento local"""
+        # Sin mkdir aqui: _write_file_sync crea base_folder/<fecha> en la
+        # primera escritura
         self.base_folder = Path(f"/app/{self.config.evidence_folder}")
-        self.base_folder.mkdir(exist_ok=True, parents=True)
+        self._url_prefix = "/evidencias_neural/"
         logger.info(f"Local storage configured: {self.base_folder}")
 
     def _setup_oracle_cloud_storage(self):
@@ -40,22 +74,48 @@ class NeuralStorageService:
                 logger.info("Configurando autenticacion con Instance Principal...")
                 signer = oci.auth.signers.InstancePrincipalsSecurityTokenSigner()
             else:
-                logger.info("Configurando autenticacion con archivo de configuracion...")
+                logger.info(
+                    "Configurando autenticacion con archivo de configuracion..."
+                )
                 signer = oci.config.from_file()
 
             self.object_storage_client = ObjectStorageClient(
-                config={}
-                if self.config.oracle_auth_type == "instance_principal"
-                else signer,
-                signer=signer
-                if self.config.oracle_auth_type == "instance_principal"
-                else None,
+                config=(
+                    {}
+                    if self.config.oracle_auth_type == "instance_principal"
+                    else signer
+                ),
+                signer=(
+                    signer
+                    if self.config.oracle_auth_type == "instance_principal"
+                    else None
+                ),
             )
 
+            self._io_executor = ThreadPoolExecutor(
+                max_workers=self.config.oracle_upload_concurrency,
+                thread_name_prefix="oci-upload",
+            )
+
+            # Firmador que el SDK construyo (instance principal o archivo de config)
+            self._signer = self.object_storage_client.base_client.signer
+
             self.namespace = self.config.oracle_namespace
             self.bucket_name = self.config.oracle_bucket_name
             self.endpoint_url = self.config.get_oracle_endpoint()
 
+            # Prefijos de URL fijos por cliente: por objeto solo se concatena
+            region = self.config.oracle_region
+            self._url_prefix = (
+                f"https://{self.namespace}.objectstorage.{region}.oci.customer-oci.com"
+                f"/n/{self.namespace}/b/{self.bucket_name}/o/"
+            )
+            self._presign_base = f"https://objectstorage.{region}.oraclecloud.com"
+            self._object_url_prefix = (
+                f"{self.endpoint_url}/n/{quote(self.namespace, safe='')}"
+                f"/b/{quote(self.bucket_name, safe='')}/o/"
+            )
+
             logger.info(f"Oracle Cloud Object Storage configured for Neural:")
             logger.info(f"  Namespace: {self.namespace}")
             logger.info(f"  Bucket: {self.bucket_name}")
@@ -68,13 +128,103 @@ class NeuralStorageService:
 
     def get_bucket_url(self, object_name: str) -> str:
         """Construye la URL completa del objeto en el bucket"""
-        if self.storage_type == "oracle_cloud":
-            return f"https://{self.namespace}.objectstorage.{self.config.oracle_region}.oci.customer-oci.com/n/{self.namespace}/b/{self.bucket_name}/o/{object_name}"
-        else:
-            return f"/evidencias_neural/{object_name}"
+        return self._url_prefix + object_name
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Sesion HTTP compartida; las conexiones TLS se reutilizan entre subidas"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.config.oracle_upload_concurrency,
+                    keepalive_timeout=_HTTP_KEEPALIVE_SEC,
+                ),
+                timeout=_HTTP_TIMEOUT,
+            )
+        return self._session
+
+    def _object_url(self, object_name: str) -> str:
+        """URL REST del objeto (nombre codificado igual que el SDK)"""
+        return self._object_url_prefix + quote(object_name, safe="")
+
+    def _sign_headers(self, method: str, url: str, headers: Optional[dict]) -> dict:
+        """
+        Headers firmados para la peticion (sincrono: el signer de Instance
+        Principal renueva su token con una llamada HTTP bloqueante al servicio
+        de metadata, por eso se ejecuta en _io_executor).
+        """
+        prepared = requests.Request(method, url, headers=headers).prepare()
+        # Object Storage no exige firmar el cuerpo (igual que put_object del SDK)
+        self._signer(prepared, enforce_content_headers=False)
+        signed_headers = dict(prepared.headers)
+        # requests pone Content-Length: 0 sin cuerpo; aiohttp lo calcula
+        signed_headers.pop("Content-Length", None)
+        return signed_headers
+
+    async def _signed_request(
+        self,
+        method: str,
+        object_name: str,
+        headers: Optional[dict] = None,
+        data: Optional[bytes] = None,
+    ) -> None:
+        """
+        Ejecuta una peticion al API REST de Object Storage firmada con el
+        firmador del SDK. Reintenta 429/5xx y errores de conexion como la
+        estrategia por defecto del SDK; lanza ServiceError si no es 2xx.
+        """
+        url = self._object_url(object_name)
+        session = self._get_session()
+        loop = asyncio.get_running_loop()
+
+        for attempt in range(_HTTP_MAX_ATTEMPTS):
+            if attempt:
+                await asyncio.sleep(_HTTP_RETRY_BACKOFF_SEC * 2 ** (attempt - 1))
+
+            # Se firma en cada intento (la firma incluye el header date); solo
+            # la E/S de aiohttp queda en el event loop
+            signed_headers = await loop.run_in_executor(
+                self._io_executor, self._sign_headers, method, url, headers
+            )
+
+            try:
+                async with session.request(
+                    method,
+                    URL(url, encoded=True),
+                    headers=signed_headers,
+                    data=data,
+                ) as response:
+                    if response.status < 300:
+                        return
+                    body = await response.read()
+            except aiohttp.ClientConnectionError:
+                if attempt + 1 == _HTTP_MAX_ATTEMPTS:
+                    raise
+                continue
+
+            if (
+                response.status in _HTTP_RETRY_STATUSES
+                and attempt + 1 < _HTTP_MAX_ATTEMPTS
+            ):
+                continue
+
+            try:
+                error = orjson.loads(body)
+            except orjson.JSONDecodeError:
+                error = {}
+            raise ServiceError(
+                response.status,
+                error.get("code", "Unknown"),
+                dict(response.headers),
+                error.get("message", body.decode(errors="replace")),
+            )
 
     async def save_image(
-        self, image_data: bytes, imagename: str, plate_prefix: str = "unknown"
+        self,
+        image_data: bytes,
+        imagename: str,
+        plate_prefix: str = "unknown",
+        now: Optional[datetime] = None,
+        request_id: Optional[str] = None,
     ) -> Tuple[str, str]:
         """
         Guarda una imagen de Neural
@@ -83,36 +233,38 @@ class NeuralStorageService:
             image_data: Datos binarios de la imagen
             imagename: Nombre de la imagen
             plate_prefix: Prefijo de la placa para el nombre del archivo
+            now: Hora del request (UTC) para la carpeta; por defecto la actual
+            request_id: Sufijo unico del request (compartido por sus imagenes);
+                por defecto uno nuevo
 
         Returns:
             tuple: (ruta_relativa, url_completa_bucket)
         """
+        if now is None:
+            now = datetime.now(timezone.utc)
+        if request_id is None:
+            request_id = new_request_id()
+
+        date = now.date().isoformat()
+        filename = f"{plate_prefix}_neural_{request_id}_{imagename}"
+
         if self.storage_type == "local":
-            return await self._save_image_local(image_data, imagename, plate_prefix)
+            return await self._save_image_local(image_data, date, filename)
         elif self.storage_type == "oracle_cloud":
-            return await self._save_image_oracle_cloud(
-                image_data, imagename, plate_prefix
-            )
+            return await self._save_image_oracle_cloud(image_data, date, filename, now)
         else:
             raise ValueError(
                 f"Tipo de almacenamiento no soportado: {self.storage_type}"
             )
 
     async def _save_image_local(
-        self, image_data: bytes, imagename: str, plate_prefix: str
+        self, image_data: bytes, date: str, filename: str
     ) -> Tuple[str, str]:
         """Guarda imagen en almacenamiento local"""
         try:
-            date = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-            date_folder = self.base_folder / date
-            date_folder.mkdir(exist_ok=True, parents=True)
-
-            timestamp = datetime.now(timezone.utc).strftime("%H%M%S_%f")
-            filename = f"{plate_prefix}_neural_{timestamp}_{imagename}"
-            full_path = date_folder / filename
-
-            async with aiofiles.open(full_path, "wb") as f:
-                await f.write(image_data)
+            full_path = self.base_folder / date / filename
+            # Un solo salto al thread pool (mkdir + open + write + close)
+            await asyncio.to_thread(self._write_file_sync, full_path, image_data)
 
             relative_path = f"{date}/{filename}"
             full_bucket_url = self.get_bucket_url(
@@ -125,41 +277,38 @@ class NeuralStorageService:
             logger.error(f"Error saving Neural image locally: {e}")
             raise
 
+    @staticmethod
+    def _write_file_sync(full_path: Path, image_data: bytes) -> None:
+        """Escribe la imagen con os.write sobre un descriptor crudo"""
+        full_path.parent.mkdir(exist_ok=True, parents=True)
+        fd = os.open(full_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            view = memoryview(image_data)
+            while view:
+                view = view[os.write(fd, view) :]
+        finally:
+            os.close(fd)
+
     async def _save_image_oracle_cloud(
-        self, image_data: bytes, imagename: str, plate_prefix: str
+        self, image_data: bytes, date: str, filename: str, now: datetime
     ) -> Tuple[str, str]:
         """Guarda imagen en Oracle Cloud Object Storage"""
         try:
-            date = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-            timestamp = datetime.now(timezone.utc).strftime("%H%M%S_%f")
-            filename = f"{plate_prefix}_neural_{timestamp}_{imagename}"
             # Path dentro del bucket: evidencias_neural/fecha/archivo.jpg
             object_name = f"evidencias_neural/{date}/{filename}"
 
-            opc_meta = {
-                "upload-time": datetime.now(timezone.utc).isoformat(),
-                "worker-id": self.config.worker_id,
-                "source": "neural-camera",
-                "camera-type": "neural",
+            headers = {
+                "content-type": "image/jpeg",
+                "opc-meta-upload-time": now.isoformat(),
+                "opc-meta-worker-id": self.config.worker_id,
+                "opc-meta-source": "neural-camera",
+                "opc-meta-camera-type": "neural",
             }
 
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(
-                None,
-                lambda: self.object_storage_client.put_object(
-                    namespace_name=self.namespace,
-                    bucket_name=self.bucket_name,
-                    object_name=object_name,
-                    put_object_body=image_data,
-                    content_type="image/jpeg",
-                    opc_meta=opc_meta,
-                ),
-            )
+            await self._signed_request("PUT", object_name, headers, image_data)
 
             relative_path = f"{date}/{filename}"
-            full_bucket_url = self.get_bucket_url(
-                f"evidencias_neural/{date}/{filename}"
-            )
+            full_bucket_url = self.get_bucket_url(object_name)
             logger.info(f"Neural image uploaded to Oracle Cloud: {object_name}")
             return relative_path, full_bucket_url
 
@@ -181,18 +330,20 @@ class NeuralStorageService:
             try:
                 object_name = f"evidencias_neural/{image_path}"
 
-                loop = asyncio.get_event_loop()
+                loop = asyncio.get_running_loop()
 
-                request = oci.object_storage.models.CreatePreauthenticatedRequestDetails(
-                    name=f"neural-temp-access-{datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S')}",
-                    object_name=object_name,
-                    access_type="ObjectRead",
-                    time_expires=datetime.now(timezone.utc)
-                    + timedelta(seconds=expires_in),
+                request = (
+                    oci.object_storage.models.CreatePreauthenticatedRequestDetails(
+                        name=f"neural-temp-access-{uuid.uuid4().hex}",
+                        object_name=object_name,
+                        access_type="ObjectRead",
+                        time_expires=datetime.now(timezone.utc)
+                        + timedelta(seconds=expires_in),
+                    )
                 )
 
                 response = await loop.run_in_executor(
-                    None,
+                    self._io_executor,
                     lambda: self.object_storage_client.create_preauthenticated_request(
                         namespace_name=self.namespace,
                         bucket_name=self.bucket_name,
@@ -200,16 +351,10 @@ class NeuralStorageService:
                     ),
                 )
 
-                base_url = f"https://objectstorage.{self.config.oracle_region}.oraclecloud.com"
-                access_uri = response.data.access_uri
-                full_url = f"{base_url}{access_uri}"
-
-                return full_url
+                return self._presign_base + response.data.access_uri
 
             except Exception as e:
-                logger.error(
-                    f"Error generating presigned URL for Neural image: {e}"
-                )
+                logger.error(f"Error generating presigned URL for Neural image: {e}")
                 return None
 
         return None
@@ -240,15 +385,7 @@ class NeuralStorageService:
         try:
             object_name = f"evidencias_neural/{image_path}"
 
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(
-                None,
-                lambda: self.object_storage_client.delete_object(
-                    namespace_name=self.namespace,
-                    bucket_name=self.bucket_name,
-                    object_name=object_name,
-                ),
-            )
+            await self._signed_request("DELETE", object_name)
 
             logger.info(f"Neural image deleted from Oracle Cloud: {object_name}")
             return True
@@ -257,6 +394,42 @@ class NeuralStorageService:
             logger.error(f"Error deleting Neural image from Oracle Cloud: {e}")
             return False
 
+    async def _get_bucket_info(self) -> dict:
+        """
+        Metadatos del bucket via get_bucket, cacheados HEALTH_CHECK_INTERVAL
+        segundos. Solo se cachean respuestas exitosas: un error se propaga y el
+        siguiente probe vuelve a consultar OCI.
+        """
+        async with self._health_lock:
+            cached_at, bucket_info = self._bucket_info
+            now = time.monotonic()
+            if (
+                bucket_info is not None
+                and now - cached_at < self.config.health_check_interval
+            ):
+                return bucket_info
+
+            loop = asyncio.get_running_loop()
+            response = await loop.run_in_executor(
+                self._io_executor,
+                lambda: self.object_storage_client.get_bucket(
+                    namespace_name=self.namespace,
+                    bucket_name=self.bucket_name,
+                ),
+            )
+
+            bucket_info = {
+                "name": response.data.name,
+                "compartment_id": response.data.compartment_id,
+                "created": (
+                    response.data.time_created.isoformat()
+                    if response.data.time_created
+                    else None
+                ),
+            }
+            self._bucket_info = (time.monotonic(), bucket_info)
+            return bucket_info
+
     async def health_check(self) -> dict:
         """Verifica el estado del servicio de almacenamiento"""
         if self.storage_type == "local":
@@ -270,16 +443,7 @@ class NeuralStorageService:
 
         elif self.storage_type == "oracle_cloud":
             try:
-                loop = asyncio.get_event_loop()
-
-                response = await loop.run_in_executor(
-                    None,
-                    lambda: self.object_storage_client.get_bucket(
-                        namespace_name=self.namespace,
-                        bucket_name=self.bucket_name,
-                    ),
-                )
-
+                bucket_info = await self._get_bucket_info()
                 return {
                     "storage_type": "oracle_cloud",
                     "status": "healthy",
@@ -287,13 +451,7 @@ class NeuralStorageService:
                     "namespace": self.namespace,
                     "region": self.config.oracle_region,
                     "auth_type": self.config.oracle_auth_type,
-                    "bucket_info": {
-                        "name": response.data.name,
-                        "compartment_id": response.data.compartment_id,
-                        "created": response.data.time_created.isoformat()
-                        if response.data.time_created
-                        else None,
-                    },
+                    "bucket_info": dict(bucket_info),
                 }
 
             except Exception as e:
@@ -306,3 +464,12 @@ class NeuralStorageService:
                 }
 
         return {"storage_type": "unknown", "status": "unhealthy"}
+
+    async def close(self):
+        """Cierra la sesion HTTP y libera los hilos de OCI"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        if self._io_executor is not None:
+            self._io_executor.shutdown(wait=False)
+            self._io_executor = None
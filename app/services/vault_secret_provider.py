@@ -1,9 +1,16 @@
 import asyncio
-import base64
 import logging
 import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from typing import Dict, Optional, Tuple
 
+try:
+    # Decodificador SIMD (libbase64); mismo fallback que en event_processor
+    from pybase64 import b64decode
+except ImportError:
+    from base64 import b64decode
+
 import oci
 from oci.exceptions import ServiceError
 from oci.secrets import SecretsClient
@@ -12,6 +19,13 @@ logger = logging.getLogger(__name__)
 
 DEFAULT_CACHE_TTL_SECONDS = 24 * 60 * 60  # 24 horas
 
+# Errores definitivos de vault (404, 400, ...) se recuerdan este tiempo para no
+# repetir la llamada en cada request; auth (401/403), 429 y 5xx no se cachean
+NEGATIVE_CACHE_TTL_SECONDS = 60
+
+# Hilos propios para el SDK de OCI (acotados: pocos secretos, llamadas raras)
+_VAULT_EXECUTOR_WORKERS = 4
+
 
 class VaultSecretProvider:
     """
@@ -31,8 +45,21 @@ class VaultSecretProvider:
         self._cache_ttl = cache_ttl
         self._secrets_client: Optional[SecretsClient] = None
         self._signer = None
+        # (valor, refresh_at): deadline monotonic a partir del cual el valor se
+        # sirve stale y se refresca en segundo plano (fetch + TTL/2)
         self._cache: Dict[str, Tuple[str, float]] = {}
+        # Cache negativa: nombre -> (status, code, message, retry_at monotonic)
+        self._failures: Dict[str, Tuple[int, str, str, float]] = {}
+        # Single-flight por nombre: el Task del fetch en curso. Los llamadores
+        # concurrentes esperan el mismo Task (equivale a un lock por nombre con
+        # re-chequeo de cache, sin lock global ni limpieza en finally)
+        self._inflight: Dict[str, asyncio.Task] = {}
         self._initialized = False
+        # Sin compartir el executor por defecto: un arranque en frio con vault
+        # lento no bloquea el resto de run_in_executor / to_thread del proceso
+        self._executor = ThreadPoolExecutor(
+            max_workers=_VAULT_EXECUTOR_WORKERS, thread_name_prefix="vault"
+        )
 
     def initialize(self) -> None:
         """
@@ -61,27 +88,86 @@ class VaultSecretProvider:
     async def get_secret(self, secret_name: str, force_refresh: bool = False) -> str:
         """
         Obtiene el valor de un secreto por nombre desde OCI Vault.
-        Usa cache si esta disponible y no ha expirado.
+        Stale-while-revalidate: con edad < TTL/2 se sirve desde cache; a partir
+        de TTL/2 se sirve el valor cacheado y se refresca en segundo plano, de
+        modo que una caida de vault no bloquea a los llamadores.
+        Un error definitivo de vault (404, 400...) se recuerda
+        NEGATIVE_CACHE_TTL_SECONDS: sin valor cacheado se re-lanza sin llamar a
+        OCI, con valor stale se sirve sin reintentar el refresco.
+        force_refresh espera siempre al valor fresco.
         """
         if not self._initialized:
             raise RuntimeError("VaultSecretProvider no inicializado")
 
-        if not force_refresh and secret_name in self._cache:
-            value, fetched_at = self._cache[secret_name]
-            age = time.time() - fetched_at
-            if age < self._cache_ttl:
-                logger.debug(
-                    f"VaultSecretProvider: Cache hit para '{secret_name}' "
-                    f"(edad: {age:.0f}s)"
-                )
+        entry = None if force_refresh else self._cache.get(secret_name)
+        if entry is not None:
+            value, refresh_at = entry
+            now = time.monotonic()
+            if now < refresh_at:
+                # La edad solo se calcula si el log de debug esta activo
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(
+                        "VaultSecretProvider: Cache hit para '%s' (edad: %.0fs)",
+                        secret_name,
+                        now - refresh_at + self._cache_ttl / 2,
+                    )
                 return value
-            else:
-                logger.info(
-                    f"VaultSecretProvider: Cache expirado para '{secret_name}' "
-                    f"(edad: {age:.0f}s)"
-                )
 
-        return await self._fetch_and_cache(secret_name)
+            if self._recent_failure(secret_name) is not None:
+                # Vault respondio con error definitivo hace poco: servir stale sin
+                # reintentar hasta que venza la cache negativa
+                return value
+
+            # Ruta lenta (valor a refrescar): la edad solo se calcula para el log
+            age = now - refresh_at + self._cache_ttl / 2
+            logger.info(
+                "VaultSecretProvider: Cache %s para '%s' (edad: %.0fs), "
+                "refrescando en segundo plano",
+                "expirado" if age >= self._cache_ttl else "por expirar",
+                secret_name,
+                age,
+            )
+            self._get_inflight_fetch(secret_name)
+            return value
+
+        failure = None if force_refresh else self._recent_failure(secret_name)
+        if failure is not None:
+            status, code, message, _ = failure
+            raise ServiceError(status, code, {}, message)
+
+        return await asyncio.shield(self._get_inflight_fetch(secret_name))
+
+    def _recent_failure(
+        self, secret_name: str
+    ) -> Optional[Tuple[int, str, str, float]]:
+        """Error cacheado del secreto si aun no vence su TTL negativo"""
+        failure = self._failures.get(secret_name)
+        if failure is not None and time.monotonic() >= failure[3]:
+            del self._failures[secret_name]
+            return None
+        return failure
+
+    def _get_inflight_fetch(self, secret_name: str) -> asyncio.Task:
+        """
+        Devuelve el fetch en curso para el secreto o inicia uno nuevo, de modo
+        que llamadas concurrentes comparten un unico round-trip a vault.
+        """
+        task = self._inflight.get(secret_name)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_and_cache(secret_name))
+            self._inflight[secret_name] = task
+            task.add_done_callback(lambda _: self._inflight.pop(secret_name, None))
+            task.add_done_callback(self._log_fetch_failure)
+        return task
+
+    @staticmethod
+    def _log_fetch_failure(task: asyncio.Task) -> None:
+        """Registra fallos del fetch; el valor cacheado (si existe) se conserva."""
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(
+                f"VaultSecretProvider: Fetch fallido, se conserva el valor "
+                f"cacheado si existe: {task.exception()}"
+            )
 
     async def _fetch_and_cache(self, secret_name: str) -> str:
         """
@@ -92,19 +178,18 @@ class VaultSecretProvider:
             f"VaultSecretProvider: Obteniendo secreto '{secret_name}' desde vault..."
         )
 
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
         try:
-            response = await loop.run_in_executor(
-                None,
-                lambda: self._secrets_client.get_secret_bundle_by_name(
-                    secret_name=secret_name, vault_id=self.vault_id
-                ),
+            fetch = partial(
+                self._secrets_client.get_secret_bundle_by_name,
+                secret_name=secret_name,
+                vault_id=self.vault_id,
             )
+            response = await loop.run_in_executor(self._executor, fetch)
 
-            base64_content = response.data.secret_bundle_content.content
-            secret_value = base64.b64decode(base64_content).decode("utf-8")
+            secret_value = self._decode_bundle(response)
 
-            self._cache[secret_name] = (secret_value, time.time())
+            self._store(secret_name, secret_value)
             logger.info(
                 f"VaultSecretProvider: Secreto '{secret_name}' obtenido y cacheado"
             )
@@ -118,15 +203,15 @@ class VaultSecretProvider:
                     f"'{secret_name}', refrescando signer..."
                 )
                 await self._refresh_signer()
-                response = await loop.run_in_executor(
-                    None,
-                    lambda: self._secrets_client.get_secret_bundle_by_name(
-                        secret_name=secret_name, vault_id=self.vault_id
-                    ),
+                # partial nuevo: debe ligarse al cliente recreado con el signer fresco
+                fetch = partial(
+                    self._secrets_client.get_secret_bundle_by_name,
+                    secret_name=secret_name,
+                    vault_id=self.vault_id,
                 )
-                base64_content = response.data.secret_bundle_content.content
-                secret_value = base64.b64decode(base64_content).decode("utf-8")
-                self._cache[secret_name] = (secret_value, time.time())
+                response = await loop.run_in_executor(self._executor, fetch)
+                secret_value = self._decode_bundle(response)
+                self._store(secret_name, secret_value)
                 logger.info(
                     f"VaultSecretProvider: Secreto '{secret_name}' obtenido tras "
                     f"refresh del signer"
@@ -137,8 +222,28 @@ class VaultSecretProvider:
                     f"VaultSecretProvider: ServiceError obteniendo '{secret_name}': "
                     f"{e.status} - {e.message}"
                 )
+                if e.status < 500 and e.status != 429:
+                    self._failures[secret_name] = (
+                        e.status,
+                        e.code,
+                        e.message,
+                        time.monotonic() + NEGATIVE_CACHE_TTL_SECONDS,
+                    )
                 raise
 
+    def _store(self, secret_name: str, secret_value: str) -> None:
+        """Cachea el valor con su deadline de refresco (monotonic, inmune a saltos de reloj)"""
+        self._failures.pop(secret_name, None)
+        self._cache[secret_name] = (
+            secret_value,
+            time.monotonic() + self._cache_ttl / 2,
+        )
+
+    @staticmethod
+    def _decode_bundle(response) -> str:
+        """Contenido del secret bundle (base64) como texto UTF-8"""
+        return b64decode(response.data.secret_bundle_content.content).decode("utf-8")
+
     async def _refresh_signer(self) -> None:
         """
         Refresca el Instance Principal signer.
@@ -147,10 +252,10 @@ class VaultSecretProvider:
             return
 
         logger.info("VaultSecretProvider: Refrescando Instance Principal signer...")
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
         try:
             self._signer = await loop.run_in_executor(
-                None, oci.auth.signers.InstancePrincipalsSecurityTokenSigner
+                self._executor, oci.auth.signers.InstancePrincipalsSecurityTokenSigner
             )
             self._secrets_client = SecretsClient(config={}, signer=self._signer)
             logger.info("VaultSecretProvider: Signer refrescado exitosamente")
@@ -158,13 +263,18 @@ class VaultSecretProvider:
             logger.error(f"VaultSecretProvider: Error al refrescar signer: {e}")
             raise
 
+    async def close(self) -> None:
+        """Libera los hilos del provider; un fetch en curso termina en segundo plano"""
+        self._executor.shutdown(wait=False)
+
     def invalidate(self, secret_name: str) -> None:
-        """Elimina un secreto especifico del cache."""
-        if secret_name in self._cache:
-            del self._cache[secret_name]
+        """Elimina un secreto especifico del cache (incluida la cache negativa)."""
+        self._failures.pop(secret_name, None)
+        if self._cache.pop(secret_name, None) is not None:
             logger.info(f"VaultSecretProvider: Cache invalidado para '{secret_name}'")
 
     def invalidate_all(self) -> None:
         """Limpia todo el cache de secretos."""
         self._cache.clear()
+        self._failures.clear()
         logger.info("VaultSecretProvider: Todo el cache de secretos invalidado")
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# El servicio importa sus modulos desde app/ (models, services, utils...)
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app")
+)
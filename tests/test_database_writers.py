@@ -0,0 +1,265 @@
+import asyncio
+import contextlib
+from types import SimpleNamespace
+
+import pytest
+
+from models.events import EventRow
+from services.database_service import (
+    _COPY_MIN_ROWS,
+    _EVENT_COLUMNS,
+    _INSERT_EVENT_SQL,
+    NeuralDatabaseService,
+)
+
+
+class FakeTransaction:
+    def __init__(self, conn):
+        self.conn = conn
+
+    async def __aenter__(self):
+        self.conn.pending = []
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        pending, self.conn.pending = self.conn.pending, []
+        if exc_type is None:
+            # El COMMIT queda aplicado antes de que llegue la respuesta
+            self.conn.pool.rows.extend(pending)
+            await self.conn.pool.commit_ack.wait()
+        return False
+
+
+class FakeConnection:
+    def __init__(self, pool):
+        self.pool = pool
+        self.pending = []
+
+    async def fetchval(self, sql, *args):
+        await asyncio.sleep(0)
+        return self.pool.insert(self, args)
+
+    def transaction(self):
+        return FakeTransaction(self)
+
+    def is_closed(self):
+        return False
+
+
+class FakePool:
+    """Pool de escritura en memoria: rows solo recibe filas confirmadas."""
+
+    next_id = 0
+
+    def __init__(self):
+        self.rows = []
+        self.in_use = set()
+        self.commit_ack = asyncio.Event()
+        self.commit_ack.set()
+
+    def insert(self, conn, args):
+        FakePool.next_id += 1
+        conn.pending.append((FakePool.next_id, args))
+        return FakePool.next_id
+
+    async def acquire(self):
+        conn = FakeConnection(self)
+        self.in_use.add(conn)
+        return conn
+
+    async def release(self, conn):
+        self.in_use.discard(conn)
+
+    async def close(self):
+        pass
+
+    def terminate(self):
+        pass
+
+
+def make_service(**overrides):
+    settings = {
+        "db_batch_max_size": 10,
+        "db_batch_max_wait_ms": 5,
+        "db_writer_workers": 1,
+        "db_pool_drain_sec": 0.01,
+        "db_write_host": "write",
+        "db_read_host": "read",
+    }
+    settings.update(overrides)
+    service = NeuralDatabaseService(SimpleNamespace(**settings))
+    service.write_pool = FakePool()
+    return service
+
+
+def enqueue(service, count):
+    loop = asyncio.get_running_loop()
+    items = [
+        ("event", EventRow(plate=f"ABC{i:03d}"), loop.create_future())
+        for i in range(count)
+    ]
+    for item in items:
+        service._write_queue.put_nowait(item)
+    return items
+
+
+async def settle():
+    for _ in range(50):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_cancel_while_collecting_requeues_dequeued_items():
+    service = make_service(db_batch_max_wait_ms=60_000)
+    service._start_writers()
+    items = enqueue(service, 3)
+    await settle()
+    assert service._write_queue.empty()
+
+    for task in service._writer_tasks:
+        task.cancel()
+    await asyncio.gather(*service._writer_tasks, return_exceptions=True)
+
+    assert service._write_queue.qsize() == 3
+    assert not any(future.done() for _, _, future in items)
+    assert service.write_pool.rows == []
+
+
+@pytest.mark.asyncio
+async def test_cancel_during_commit_fails_batch_without_requeue():
+    service = make_service(db_batch_max_size=2, db_batch_max_wait_ms=60_000)
+    pool = service.write_pool
+    pool.commit_ack.clear()
+    service._start_writers()
+    items = enqueue(service, 2)
+    await settle()
+    assert len(pool.rows) == 2
+
+    for task in service._writer_tasks:
+        task.cancel()
+    await asyncio.gather(*service._writer_tasks, return_exceptions=True)
+
+    assert service._write_queue.empty()
+    for _, _, future in items:
+        assert isinstance(future.exception(), RuntimeError)
+    assert len(pool.rows) == 2
+    assert not pool.in_use
+
+
+@pytest.mark.asyncio
+async def test_recreate_pools_while_writes_are_queued():
+    service = make_service(db_writer_workers=2, db_batch_max_size=4)
+    old_pool = service.write_pool
+    new_write, new_read = FakePool(), FakePool()
+
+    async def make_pools():
+        return new_write, new_read
+
+    service._make_pools = make_pools
+    service._start_writers()
+
+    saves = [
+        asyncio.create_task(service.save_event(EventRow(plate=f"ABC{i:03d}")))
+        for i in range(50)
+    ]
+    await settle()
+    await service.recreate_pools()
+    saves += [
+        asyncio.create_task(service.save_event(EventRow(plate=f"XYZ{i:03d}")))
+        for i in range(10)
+    ]
+    ids = await asyncio.wait_for(asyncio.gather(*saves), timeout=5)
+
+    assert None not in ids
+    assert len(set(ids)) == 60
+    committed = [row_id for row_id, _ in old_pool.rows + new_write.rows]
+    assert sorted(committed) == sorted(ids)
+    assert not old_pool.in_use
+    assert service.write_pool is new_write
+    assert len(service._writer_tasks) == 2
+
+    await service._stop_writers()
+    await asyncio.gather(*service._drain_tasks)
+    assert service._write_queue.empty()
+
+
+@pytest.mark.asyncio
+async def test_stop_ingest_persists_in_flight_batch():
+    service = make_service(db_batch_max_wait_ms=60_000)
+    persisted = []
+
+    async def ingest_batch(batch):
+        await asyncio.sleep(0.01)
+        persisted.extend(batch)
+
+    service._ingest_batch = ingest_batch
+    service._ingest_queue = asyncio.Queue(maxsize=100)
+    service._ingest_task = asyncio.create_task(service._ingest_loop())
+
+    events = [EventRow(plate=f"ABC{i:03d}") for i in range(5)]
+    for event in events:
+        await service.save_event_async(event)
+    await settle()
+    assert service.ingest_queue_depth == 0
+
+    await service._stop_ingest()
+
+    assert persisted == events
+    assert service._ingest_task is None
+
+
+class BatchConnection:
+    """Registra por que camino (COPY o executemany) llega cada lote"""
+
+    def __init__(self):
+        self.calls = []
+
+    async def copy_records_to_table(self, table, *, records, columns):
+        self.calls.append(("copy", table, list(records), columns))
+
+    async def executemany(self, sql, records):
+        self.calls.append(("executemany", sql, list(records)))
+
+
+class BatchPool:
+    def __init__(self):
+        self.conn = BatchConnection()
+
+    @contextlib.asynccontextmanager
+    async def acquire(self):
+        yield self.conn
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "count, path",
+    [
+        (1, "executemany"),
+        (_COPY_MIN_ROWS - 1, "executemany"),
+        (_COPY_MIN_ROWS, "copy"),
+        (_COPY_MIN_ROWS * 3, "copy"),
+    ],
+)
+async def test_save_events_batch_splits_copy_and_executemany(count, path):
+    service = make_service()
+    service.write_pool = BatchPool()
+    events = [EventRow(plate=f"ABC{i:03d}") for i in range(count)]
+
+    assert await service.save_events_batch(events) == count
+
+    (call,) = service.write_pool.conn.calls
+    records = [event.as_record() for event in events]
+    if path == "copy":
+        assert call == ("copy", "detected_plates_wh_devices", records, _EVENT_COLUMNS)
+    else:
+        assert call == ("executemany", _INSERT_EVENT_SQL, records)
+    assert service.total_events_processed == count
+
+
+@pytest.mark.asyncio
+async def test_save_events_batch_empty_skips_database():
+    service = make_service()
+    service.write_pool = BatchPool()
+
+    assert await service.save_events_batch([]) == 0
+    assert service.write_pool.conn.calls == []
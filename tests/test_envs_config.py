@@ -0,0 +1,176 @@
+import os
+from urllib.parse import quote
+
+import pytest
+
+import envs
+from config import NeuralConfig
+
+_REQUIRED = {
+    "DB_NAME": "neural",
+    "DB_USER": "neural_user",
+    "DB_PASSWORD": "p@ss/word",
+    "DB_WRITE_HOST": "db-write",
+}
+
+
+@pytest.fixture
+def environ(monkeypatch):
+    """Entorno limpio con las variables requeridas; envs se recarga al entrar y salir"""
+    for key in envs.environment_variables:
+        monkeypatch.delenv(key, raising=False)
+    for key, value in _REQUIRED.items():
+        monkeypatch.setenv(key, value)
+    envs.reload()
+    yield monkeypatch
+    envs.reload()
+
+
+@pytest.fixture
+def cores(monkeypatch):
+    def set_cores(count):
+        monkeypatch.setattr(os, "sched_getaffinity", lambda pid: set(range(count)))
+
+    return set_cores
+
+
+def test_envs_parses_defaults(environ):
+    assert envs.DB_WRITE_PORT == 5432
+    assert envs.DB_BATCH_MAX_WAIT_MS == 5.0
+    assert envs.EVENT_INGEST_ASYNC is False
+    assert envs.REJECT_FOREIGN_PLATES is True
+    assert envs.DB_MAX_CONNECTIONS is None
+    assert envs.LOG_LEVEL == "INFO"
+
+
+def test_envs_read_endpoint_falls_back_to_write(environ):
+    environ.setenv("DB_WRITE_PORT", "6432")
+    envs.reload()
+
+    assert envs.DB_READ_HOST == "db-write"
+    assert envs.DB_READ_PORT == 6432
+
+
+def test_envs_parses_typed_values(environ):
+    environ.setenv("DB_MAX_CONNECTIONS", "12")
+    environ.setenv("DB_POOL_STRATEGY", "BURST")
+    environ.setenv("ENABLE_CORS", "TRUE")
+    environ.setenv("LOG_LEVEL", "debug")
+    environ.setenv("DB_MIN_CONNECTIONS", "")
+    envs.reload()
+
+    assert envs.DB_MAX_CONNECTIONS == 12
+    assert envs.DB_MIN_CONNECTIONS is None
+    assert envs.DB_POOL_STRATEGY == "burst"
+    assert envs.ENABLE_CORS is True
+    assert envs.LOG_LEVEL == "DEBUG"
+
+
+def test_envs_caches_until_reload(environ):
+    assert envs.DB_QUERY_TIMEOUT == 10
+    environ.setenv("DB_QUERY_TIMEOUT", "20")
+    assert envs.DB_QUERY_TIMEOUT == 10
+
+    envs.reload()
+    assert envs.DB_QUERY_TIMEOUT == 20
+
+
+def test_envs_unknown_attribute(environ):
+    with pytest.raises(AttributeError):
+        envs.NOT_A_VARIABLE
+    assert "DB_NAME" in dir(envs)
+
+
+@pytest.mark.parametrize(
+    "strategy, count, expected",
+    [
+        ("oltp", 1, (4, 4)),
+        ("oltp", 4, (5, 9)),
+        ("oltp", 32, (5, 20)),
+        ("burst", 1, (2, 8)),
+        ("burst", 4, (2, 17)),
+        ("burst", 32, (2, 40)),
+    ],
+)
+def test_size_db_pool_from_cores(environ, cores, strategy, count, expected):
+    environ.setenv("DB_POOL_STRATEGY", strategy)
+    envs.reload()
+    cores(count)
+
+    config = NeuralConfig()
+
+    assert (config.db_min_connections, config.db_max_connections) == expected
+
+
+def test_size_db_pool_explicit_values_win(environ, cores):
+    environ.setenv("DB_MIN_CONNECTIONS", "3")
+    environ.setenv("DB_MAX_CONNECTIONS", "7")
+    envs.reload()
+    cores(32)
+
+    config = NeuralConfig()
+
+    assert (config.db_min_connections, config.db_max_connections) == (3, 7)
+
+
+def test_write_pool_keeps_one_connection_per_writer(environ, cores):
+    environ.setenv("DB_WRITER_WORKERS", "6")
+    envs.reload()
+    cores(8)
+
+    config = NeuralConfig()
+
+    assert config.db_pool_sizes["write"] == (6, 17)
+    assert config.db_pool_sizes["read"] == (5, 17)
+
+
+@pytest.mark.parametrize(
+    "key, value",
+    [
+        ("DB_WRITER_WORKERS", "17"),
+        ("DB_WRITER_WORKERS", "0"),
+        ("DB_POOL_STRATEGY", "olap"),
+        ("STORAGE_TYPE", "s3"),
+        ("DB_BATCH_MAX_SIZE", "0"),
+        ("MAX_INFLIGHT_EVENTS", "0"),
+        ("STATS_ROLLUP_REFRESH_SEC", "0"),
+        ("ORACLE_UPLOAD_CONCURRENCY", "0"),
+    ],
+)
+def test_validators_reject_invalid_config(environ, cores, key, value):
+    environ.setenv(key, value)
+    envs.reload()
+    cores(8)
+
+    with pytest.raises(SystemExit):
+        NeuralConfig()
+
+
+def test_missing_required_variable_exits(environ):
+    environ.delenv("DB_NAME")
+    envs.reload()
+
+    with pytest.raises(SystemExit):
+        NeuralConfig()
+
+
+def test_update_db_password_rerenders_urls(environ):
+    config = NeuralConfig()
+    assert config.database_write_url == (
+        f"postgresql+asyncpg://neural_user:{quote('p@ss/word', safe='')}"
+        "@db-write:5432/neural"
+    )
+
+    config.update_db_password("n3w:pw")
+
+    assert ":n3w%3Apw@db-write:5432/" in config.database_write_url
+    assert ":n3w%3Apw@db-write:5432/" in config.database_read_url
+
+
+def test_database_info_is_read_only(environ):
+    config = NeuralConfig()
+
+    with pytest.raises(TypeError):
+        config.database_info["database"] = "other"
+    with pytest.raises(TypeError):
+        config.database_info["pool_config"]["strategy"] = "burst"
@@ -0,0 +1,48 @@
+import dataclasses
+import re
+from datetime import datetime, timezone
+
+from models.events import EventRow, RejectedRow
+from services import database_service
+
+
+def insert_columns(sql):
+    """Columnas del INSERT en el orden en que se enlazan $1..$n"""
+    columns = re.search(r"\(([^)]*)\)\s*VALUES", sql).group(1)
+    return tuple(column.strip() for column in columns.split(","))
+
+
+def test_event_row_fields_follow_insert_columns():
+    fields = tuple(field.name for field in dataclasses.fields(EventRow))
+
+    assert fields == database_service._EVENT_COLUMNS
+    assert insert_columns(database_service._INSERT_EVENT_SQL) == fields
+
+
+def test_event_row_as_record_order():
+    values = {
+        "plate": "ABC123",
+        "image_url": "https://bucket/o/ABC123.jpg",
+        "camera_brand": "neural",
+        "camera_id": "cam-1",
+        "camera_location": "Calle 80",
+        "violation_type": "speeding",
+        "vehicle_type": "car",
+        "direction": "in",
+        "confidence": 0.97,
+        "capture_time": datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+        "raw_data": '{"plate": "ABC123"}',
+        "ocr_correction_report": "O->0",
+    }
+
+    record = EventRow(**values).as_record()
+
+    assert record == tuple(values[column] for column in database_service._EVENT_COLUMNS)
+
+
+def test_rejected_row_as_record_order():
+    fields = tuple(field.name for field in dataclasses.fields(RejectedRow))
+    row = RejectedRow(**{name: f"v{i}" for i, name in enumerate(fields)})
+
+    assert insert_columns(database_service._INSERT_REJECTED_SQL) == fields
+    assert row.as_record() == tuple(f"v{i}" for i in range(len(fields)))
@@ -0,0 +1,125 @@
+import dataclasses
+import logging
+import random
+from types import SimpleNamespace
+
+import pytest
+
+import baseline_plate_normalizer as baseline
+from utils import plate_normalizer
+
+# Alfabeto del fuzz: letras/digitos con correccion OCR, separadores que limpia
+# la normalizacion y caracteres cuyo upper()/lower() cambia de longitud o de
+# clase (para cubrir el lookup por firma frente a las regex originales)
+_ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcxyz0123456789OISZBG01258 -\n\tßı١²ÅéİK"
+
+_SEEDS = [
+    "ABC123",
+    "ABC12D",
+    "ABC12",
+    "123ABC",
+    "AB0123",
+    "A8C123",
+    "ABCI23",
+    "0BC123",
+    "1Z3ABC",
+    "O8C12S",
+    "OIZ125",
+    " abc-123 ",
+    "ABC-12 3\t -",
+    "ABC1234",
+    "UNKNOWN",
+    "unknown",
+    "None",
+    "",
+]
+
+
+def _samples():
+    rnd = random.Random(1)
+    samples = set()
+    for length in range(10):
+        for _ in range(150):
+            samples.add("".join(rnd.choice(_ALPHABET) for _ in range(length)))
+    # Variantes de una posicion sobre placas conocidas (caminos de correccion OCR)
+    for seed in _SEEDS:
+        samples.add(seed)
+        for i in range(len(seed)):
+            for char in "0OI1Z2S5B8G6A9":
+                samples.add(seed[:i] + char + seed[i + 1 :])
+    return sorted(samples)
+
+
+SAMPLES = _samples()
+CONFIGS = [
+    SimpleNamespace(
+        min_confidence_neural=85.0,
+        reject_foreign_plates=reject_foreign,
+        max_ocr_corrections_neural=max_corrections,
+    )
+    for reject_foreign in (True, False)
+    for max_corrections in (-1, 0, 1, 2, 6)
+] + [SimpleNamespace()]
+
+
+@pytest.fixture(autouse=True)
+def _quiet_logs():
+    logging.disable(logging.CRITICAL)
+    yield
+    logging.disable(logging.NOTSET)
+
+
+def test_format_helpers_match_baseline():
+    for plate in SAMPLES:
+        assert plate_normalizer._is_valid_colombian_plate(
+            plate
+        ) == baseline._is_valid_colombian_plate(plate), plate
+        assert plate_normalizer._get_plate_format(plate) == baseline._get_plate_format(
+            plate
+        ), plate
+        for max_corrections in (-1, 0, 1, 2, 3, 6):
+            assert plate_normalizer._apply_ocr_correction(
+                plate, max_corrections
+            ) == baseline._apply_ocr_correction(plate, max_corrections), (
+                plate,
+                max_corrections,
+            )
+
+
+@pytest.mark.parametrize("config", CONFIGS)
+def test_normalize_neural_plate_matches_baseline(config):
+    for plate in SAMPLES:
+        for confidence in (95.0, 0.5):
+            for country in (None, "170", "840", ""):
+                expected = baseline.normalize_neural_plate(
+                    plate, confidence, country, "car", config
+                )
+                result = plate_normalizer.normalize_neural_plate(
+                    plate, confidence, country, "car", config
+                )
+                assert dataclasses.asdict(result) == dataclasses.asdict(expected), (
+                    plate,
+                    confidence,
+                    country,
+                )
+
+
+def test_normalize_neural_plate_none_matches_baseline():
+    config = CONFIGS[0]
+    assert dataclasses.asdict(
+        plate_normalizer.normalize_neural_plate(None, 95.0, None, None, config)
+    ) == dataclasses.asdict(
+        baseline.normalize_neural_plate(None, 95.0, None, None, config)
+    )
+
+
+def test_normalize_neural_plate_reads_config_on_each_call():
+    config = SimpleNamespace(min_confidence_neural=85.0)
+    assert plate_normalizer.normalize_neural_plate(
+        "ABC123", 90.0, None, None, config
+    ).is_valid
+
+    config.min_confidence_neural = 95.0
+    assert not plate_normalizer.normalize_neural_plate(
+        "ABC123", 90.0, None, None, config
+    ).is_valid